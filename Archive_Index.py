@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import Paths
+
+
+class ArchiveIndex:
+    def __init__(self, db_path=None):
+        """
+        A SQLite index of the files on the drive so they can be looked up without walking the drive every time
+        :param db_path: The file the index is stored in, Paths.ARCHIVE_INDEX by default
+        """
+        self.db_path = db_path or Paths.ARCHIVE_INDEX
+        self.connection = sqlite3.connect(self.db_path)
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(files)")]
+        if "key" in columns:  # an index made by an older version is thrown away and every directory listed again
+            self.connection.executescript("""
+                DROP TABLE files;
+                DELETE FROM directories;
+            """)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS directories (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                mtime REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                directory TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+        """)
+        self.scanned = 0  # directories that had to be listed during the last refresh
+        self.skipped = 0  # directories whose listing was reused because their mtime had not changed
+
+    def refresh(self, root):
+        """
+        Brings the index of a directory tree up to date. A directory is only listed again if its mtime changed, which
+        happens whenever a file or directory is added to, removed from or renamed in it. Directories that did not
+        change reuse their saved listing, so a refresh of an unchanged tree costs one stat per directory. A directory
+        that cannot be read, like a drive that is not mounted, keeps its saved listing instead of being emptied.
+        :param root: The directory tree to refresh
+        :return: None
+        """
+        root = os.path.abspath(root)
+        self.scanned = 0
+        self.skipped = 0
+        visited = set()
+        unavailable = []  # directories that could not be read, so what was saved about them is kept
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:  # the directory disappeared, or the whole drive is missing
+                if directory == root:
+                    unavailable.append(directory)
+                continue
+            visited.add(directory)
+            row = self.connection.execute("SELECT mtime FROM directories WHERE path = ?", (directory,)).fetchone()
+            if row and row[0] == mtime:
+                self.skipped += 1
+                stack.extend(path for (path,) in self.connection.execute(
+                    "SELECT path FROM directories WHERE parent = ?", (directory,)))
+                continue
+            self.scanned += 1
+            try:
+                stack.extend(self.scan(directory, mtime))
+            except OSError:  # the directory could not be listed
+                unavailable.append(directory)
+        if root in unavailable:
+            print(f"{root} could not be read, so the files found there last time are used")
+        # forget directories under the root that no longer exist
+        prefix = root.rstrip(os.sep) + os.sep
+        for (path,) in self.connection.execute("SELECT path FROM directories WHERE path = ? OR substr(path, 1, ?) = ?",
+                                               (root, len(prefix), prefix)).fetchall():
+            if path not in visited and not any(path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+                                               for directory in unavailable):
+                self.connection.execute("DELETE FROM files WHERE directory = ?", (path,))
+                self.connection.execute("DELETE FROM directories WHERE path = ?", (path,))
+        self.connection.commit()
+
+    def scan(self, directory, mtime):
+        """
+        Lists a directory and saves its files and subdirectories
+        :param directory: The directory to list
+        :param mtime: The directory's mtime
+        :return: A list of the directory's subdirectories
+        """
+        subdirectories = []
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):  # hidden files like the "._" copies macOS leaves on external drives
+                    continue
+                if entry.is_dir(follow_symlinks=False):  # linked directories are not followed so a loop cannot form
+                    subdirectories.append(entry.path)
+                elif entry.is_file():  # linked files are included, like the images the ImageStore links into place
+                    try:
+                        stat = entry.stat()
+                    except OSError:  # the link's target was removed while the directory was being listed
+                        continue
+                    files.append((entry.path, directory, entry.name, stat.st_size, stat.st_mtime))
+        self.connection.execute("DELETE FROM files WHERE directory = ?", (directory,))
+        self.connection.executemany("INSERT OR REPLACE INTO files (path, directory, name, size, mtime) "
+                                    "VALUES (?, ?, ?, ?, ?)", files)
+        self.connection.execute("INSERT OR REPLACE INTO directories (path, parent, mtime) VALUES (?, ?, ?)",
+                                (directory, os.path.dirname(directory), mtime))
+        # a new subdirectory is recorded right away with an mtime that never matches, so it is always listed
+        self.connection.executemany("INSERT OR IGNORE INTO directories (path, parent, mtime) VALUES (?, ?, -1)",
+                                    [(subdirectory, directory) for subdirectory in subdirectories])
+        return subdirectories
+
+    def files(self, root, extension=None):
+        """
+        Lists the indexed files under a directory
+        :param root: The directory to look under
+        :param extension: Only files with this extension are listed, for example ".tif"
+        :return: A list of (directory, name) tuples
+        """
+        root = os.path.abspath(root)
+        prefix = root.rstrip(os.sep) + os.sep
+        query = "SELECT directory, name FROM files WHERE (directory = ? OR substr(directory, 1, ?) = ?)"
+        parameters = [root, len(prefix), prefix]
+        if extension:
+            query += " AND lower(substr(name, -?)) = ?"
+            parameters += [len(extension), extension.lower()]
+        return self.connection.execute(query + " ORDER BY path", parameters).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+def open_index(*roots):
+    """
+    Opens the archive index and refreshes the given directories
+    :param roots: The directories to bring up to date
+    :return: An ArchiveIndex
+    """
+    index = ArchiveIndex()
+    for root in roots:
+        index.refresh(root)
+    return index
@@ -0,0 +1,177 @@
+import argparse
+import contextlib
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import Paths
+import Sample_Pages
+import Scraper
+from Page import Page
+from Parser import make_soup
+from Page_Visitor import PageVisitor
+
+
+class NoDownloads:
+    def submit(self, src, file_path):
+        pass  # the benchmarks measure parsing, not the network
+
+
+def measure(function, jobs, repeat):
+    """
+    Runs a function over every job, timing the fastest of several rounds and tracing the peak memory of one more
+    :param function: The function to measure; it is called with each job's arguments
+    :param jobs: A list of argument tuples
+    :param repeat: How many timed rounds to run
+    :return: A dictionary with the jobs per second, the seconds of the fastest round and the peak bytes allocated
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for job in jobs:
+            function(*job)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()  # memory is traced in a separate round since tracing slows everything down
+    for job in jobs:
+        function(*job)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"per_second": len(jobs) / best if best else 0.0, "seconds": best, "peak_bytes": peak}
+
+
+def transcriptions(page_soup, images):
+    """
+    Runs find_transcriptions on copies of a page's images, since it adds to the images it is given and every round
+    has to do the same work
+    :param page_soup: The page's PageVisitor
+    :param images: The page's images from image_info, which are left as they are
+    :return: None
+    """
+    Scraper.find_transcriptions(page_soup, {key: copy.copy(images[key]) for key in images})
+
+
+def measure_rounds(function, rounds, items):
+    """
+    Like measure, for a function that handles every item in one call and cannot be called twice on the same input
+    :param function: The function to measure
+    :param rounds: One argument tuple per timed round, plus one more for the memory round
+    :param items: How many items each call handles
+    :return: A dictionary with the items per second, the seconds of the fastest round and the peak bytes allocated
+    """
+    best = None
+    for arguments in rounds[:-1]:
+        started = time.perf_counter()
+        function(*arguments)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    function(*rounds[-1])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"per_second": items / best if best else 0.0, "seconds": best, "peak_bytes": peak}
+
+
+def run(page_count=200, repeat=5, seed=7):
+    """
+    Measures the scraper's main functions on a generated copy of the site
+    :param page_count: How many pages the generated site has
+    :param repeat: How many timed rounds each function gets
+    :param seed: Seed for the generated pages so every run measures the same html
+    :return: A dictionary with the function as the key and its measurements as the value
+    """
+    corpus = sorted(Sample_Pages.make_corpus(page_count, seed).items())
+    scraped_images = Paths.SCRAPED_IMAGES
+    # the image paths are worked out but nothing is downloaded, so the folders are made somewhere that is removed
+    with tempfile.TemporaryDirectory() as image_dir, open(os.devnull, "w") as quiet, \
+            contextlib.redirect_stdout(quiet):  # pages_info prints every page
+        Paths.SCRAPED_IMAGES = image_dir
+        try:
+            return measure_all(corpus, repeat)
+        finally:
+            Paths.SCRAPED_IMAGES = scraped_images
+
+
+def measure_all(corpus, repeat):
+    """
+    :param corpus: A list of (url, html) pairs
+    :param repeat: How many timed rounds each function gets
+    :return: A dictionary with the function as the key and its measurements as the value
+    """
+    downloader = NoDownloads()
+    results = {}
+    soups = [PageVisitor(make_soup(html)) for url, html in corpus]
+    pages = [Scraper.pages_info(html, url, downloader) for url, html in corpus]
+    results["pages_info"] = measure(Scraper.pages_info, [(html, url, downloader) for url, html in corpus], repeat)
+    results["bibliography_pairings"] = measure(Scraper.bibliography_pairings, [(soup,) for soup in soups], repeat)
+    results["find_transcriptions"] = measure(transcriptions,
+                                             [(soup, Scraper.image_info(soup, downloader)) for soup in soups], repeat)
+    results["check_if_guide"] = measure(Scraper.check_if_guide, [(soup, Page()) for soup in soups], repeat)
+    captions = [image.caption for page in pages for image in page.images.values() if image.caption]
+    pairs = [(captions[i], captions[i - 1], True) for i in range(1, len(captions))]
+    results["levenshtein_ratio_and_distance"] = measure(Scraper.levenshtein_ratio_and_distance, pairs, repeat)
+    # create_master_list changes the images it is given, so every round gets fresh copies of the pages
+    saved = [page.to_dict() for page in pages]
+    rounds = [([Page.from_dict(info) for info in saved],) for _ in range(repeat + 1)]
+    results["create_master_list"] = measure_rounds(Scraper.create_master_list, rounds, len(pages))
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """
+    :param results: The measurements from run
+    :param baseline: Measurements saved by an earlier run
+    :param tolerance: How much slower or bigger a function can be before it counts, as a fraction
+    :return: A list of messages, one for every function that got slower or uses more memory
+    """
+    found = []
+    for name in results:
+        if name not in baseline:
+            continue
+        if results[name]["per_second"] < baseline[name]["per_second"] * (1 - tolerance):
+            found.append(f"{name} is slower: {results[name]['per_second']:.1f}/s, "
+                         f"was {baseline[name]['per_second']:.1f}/s")
+        if results[name]["peak_bytes"] > baseline[name]["peak_bytes"] * (1 + tolerance):
+            found.append(f"{name} uses more memory: {results[name]['peak_bytes']} bytes, "
+                         f"was {baseline[name]['peak_bytes']} bytes")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the scraper's functions on a generated copy of the site")
+    parser.add_argument("--pages", type=int, default=200, help="how many pages to generate")
+    parser.add_argument("--repeat", type=int, default=5, help="how many timed rounds each function gets")
+    parser.add_argument("--baseline", help="the file the baseline is saved in, benchmark_baseline.json in the results "
+                                             "folder by default")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=.20,
+                        help="how much slower or bigger a function can get before it is flagged, as a fraction")
+    arguments = parser.parse_args()
+    arguments.baseline = arguments.baseline or Paths.results_path("benchmark_baseline.json")
+
+    results = run(arguments.pages, arguments.repeat)
+    for name in results:
+        print(f"{name:32} {results[name]['per_second']:12.1f}/s {results[name]['seconds']:9.4f}s "
+              f"{results[name]['peak_bytes'] / 1024:10.0f} KiB peak")
+    if arguments.save_baseline:
+        with open(arguments.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=1, sort_keys=True)
+        print(f"baseline saved to {arguments.baseline}")
+        return
+    if not os.path.exists(arguments.baseline):
+        print("no baseline to compare with; run with --save-baseline to make one")
+        return
+    with open(arguments.baseline) as baseline_file:
+        found = regressions(results, json.load(baseline_file), arguments.tolerance)
+    for message in found:
+        print("REGRESSION: " + message)
+    if found:
+        sys.exit(1)
+    print("no regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 class Caption:
+    __slots__ = ("image_link", "caption")
+
     def __init__(self):
         self.image_link = ""
         self.caption = ""
@@ -0,0 +1,218 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+import Scraper
+from Parser import make_soup, fast_links
+from Page import Page
+from Page_Visitor import PageVisitor
+from Image_Downloader import stream_to_file
+from Transport import get_transport
+from Metrics import get_metrics
+
+
+class Crawler:
+    def __init__(self, workers=16, per_host=4, frontier=None, cache=None, downloader=None, parser=None,
+                 links_only=None, parse_workers=0, parse_backlog=None):
+        self.workers = workers  # how many pages can be fetched at the same time
+        self.per_host = per_host  # how many of those fetches can go to the same host
+        self.frontier = frontier  # optional Frontier that saves the crawl so it can be resumed
+        self.cache = cache  # optional HttpCache so unchanged pages are not downloaded again
+        self.downloader = downloader  # optional ImageDownloader that saves images in the background
+        self.parser = parser  # the Beautiful Soup tree builder, Parser.PARSER by default
+        self.links_only = links_only  # optional function that is True for urls whose content is not needed
+        self.parse_workers = parse_workers  # how many processes parse pages, 0 parses them on the crawler's threads
+        # how many fetched pages can wait for a parse process before the workers stop fetching more
+        self.parse_backlog = parse_backlog or 2 * parse_workers
+        self.host_limits = {}  # a dictionary of semaphores with the host as the key
+        self.seen = set()  # every link that has been queued so the membership check is O(1)
+        self.missing = []  # links the cache had no page for, like pages left out of a WarcArchive
+        self.queue = None
+        self.executor = None
+        self.parse_pool = None
+        self.parse_slots = None
+
+    def crawl(self, links_visited, web_url, pages_list, resume=False):
+        """
+        Crawls the pmss website starting from web_url. Produces the same links_visited and pages_list as Scraper.web(),
+        only the order the pages are visited in can be different.
+        :param links_visited: List that will store all of the links visited through the crawler
+        :param web_url: The Url where the crawl starts
+        :param pages_list: A list, or a PageSink, that will hold all the information for every page
+        :param resume: If True, continue the crawl saved in the frontier instead of starting over
+        :return: None
+        """
+        try:
+            asyncio.run(self._crawl(links_visited, web_url, pages_list, resume))
+        finally:
+            if self.frontier is not None:
+                self.frontier.checkpoint()  # save the progress even if the crawl was interrupted
+
+    async def _crawl(self, links_visited, web_url, pages_list, resume):
+        self.queue = asyncio.Queue()
+        self.seen = set(links_visited)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        if self.parse_workers:
+            # the processes are started fresh instead of forked, since a fork copies the locks held by the fetch and
+            # download threads and a parse process that then takes one of them would never finish
+            self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+            self.parse_slots = asyncio.Semaphore(self.parse_backlog)
+        if self.frontier is not None and resume:
+            # pick up where the last crawl stopped without fetching the finished pages again
+            for url in self.frontier.visited():
+                if url not in self.seen:
+                    self.seen.add(url)
+                    links_visited.append(url)
+            pages_list.extend(self.frontier.pages())
+            for url in self.frontier.pending():
+                self.queue.put_nowait(url)
+        elif self.frontier is not None:
+            self.frontier.reset()
+        self.enqueue(web_url, links_visited)
+        tasks = [asyncio.ensure_future(self.worker(links_visited, pages_list)) for _ in range(self.workers)]
+        finished = asyncio.ensure_future(self.queue.join())  # done once every queued link has been processed
+        try:
+            # a worker only stops early when it raised an exception, so stop the crawl the same way web() would
+            await asyncio.wait(tasks + [finished], return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if task.done() and task.exception():
+                    raise task.exception()
+        finally:
+            finished.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.executor.shutdown(wait=True)
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown(wait=True)
+                self.parse_pool = None
+
+    def enqueue(self, web_url, links_visited):
+        """
+        Queues a link if the crawler should visit it
+        :param web_url: The link that was found
+        :param links_visited: List that will store all of the links visited through the crawler
+        :return: None
+        """
+        if Scraper.is_crawlable(web_url, self.seen):
+            self.seen.add(web_url)
+            links_visited.append(web_url)  # the link counts as visited once it is queued, just like in web()
+            if self.frontier is not None:
+                self.frontier.add(web_url)
+            self.queue.put_nowait(web_url)
+
+    async def worker(self, links_visited, pages_list):
+        loop = asyncio.get_event_loop()
+        while True:
+            web_url = await self.queue.get()
+            try:
+                async with self.host_limit(web_url):
+                    plain = await loop.run_in_executor(self.executor, fetch, web_url, self.cache)
+                if plain is None:  # there is no page to parse, so the link is only recorded
+                    self.missing.append(web_url)
+                    continue
+                if self.links_only is not None and self.links_only(web_url):
+                    page = None
+                    links = fast_links(plain)  # the content is not needed so no tree is built
+                elif self.parse_pool is not None:
+                    page, links = await self.parse_elsewhere(plain, web_url)
+                    pages_list.append(page)
+                else:
+                    started = time.perf_counter()
+                    # parses the html once and walks the tree once for the content and the links
+                    page_soup = PageVisitor(make_soup(plain, self.parser))
+                    page = Scraper.pages_info(plain, web_url, self.downloader, page_soup)  # get info for the page
+                    links = Scraper.page_links(page_soup)
+                    self.record_parse(web_url, time.perf_counter() - started)
+                    pages_list.append(page)
+                for links_destination in links:
+                    self.enqueue(links_destination, links_visited)
+                if self.frontier is not None:
+                    self.frontier.mark_done(web_url, page)  # the page's links are queued so it is finished
+            finally:
+                self.queue.task_done()
+
+    async def parse_elsewhere(self, plain, web_url):
+        """
+        Parses a page in one of the parse processes while this process keeps fetching other pages
+        :param plain: The page's raw html
+        :param web_url: The link of the page
+        :return: The Page object and the list of links found on the page
+        """
+        loop = asyncio.get_event_loop()
+        async with self.parse_slots:  # waits here, without fetching anything else, while the processes are behind
+            info, links, downloads, seconds, stages = await loop.run_in_executor(
+                self.parse_pool, parse_page, plain, web_url, self.parser)
+        self.record_parse(web_url, seconds)
+        get_metrics().merge_stages(stages)  # the stages inside pages_info were timed in the parse process
+        for src, file_path in downloads:  # the images are downloaded by this process, not the parse process
+            if self.downloader is not None:
+                self.downloader.submit(src, file_path)
+            else:
+                await loop.run_in_executor(self.executor, stream_to_file, src, file_path, get_transport())
+        return Page.from_dict(info), links
+
+    @staticmethod
+    def record_parse(web_url, seconds):
+        metrics = get_metrics()
+        metrics.record_parse(web_url, seconds)
+        metrics.add_stage("parse", seconds)
+
+    def host_limit(self, web_url):
+        """
+        Finds the semaphore that limits how many requests go to a single host at once
+        :param web_url: The link that is about to be fetched
+        :return: An asyncio Semaphore
+        """
+        host = urlsplit(web_url).netloc
+        if host not in self.host_limits:
+            self.host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self.host_limits[host]
+
+
+class DownloadList:
+    def __init__(self):
+        """
+        Takes the place of an ImageDownloader in a parse process and keeps the images that need to be downloaded
+        so the crawling process can download them instead
+        """
+        self.downloads = []
+
+    def submit(self, src, file_path):
+        self.downloads.append((src, file_path))
+
+
+def parse_page(plain, web_url, parser=None):
+    """
+    Gets the information and links from a page's html. Runs in a parse process, so everything it returns is made
+    of plain values that can be sent back to the crawling process.
+    :param plain: The page's raw html
+    :param web_url: The link of the page
+    :param parser: The Beautiful Soup tree builder, Parser.PARSER by default
+    :return: The page as a dictionary, the list of links on the page, the (src, file path) of every image to save,
+    how many seconds the page took, and the time spent in each stage of pages_info
+    """
+    started = time.perf_counter()
+    metrics = get_metrics()
+    metrics.stages.clear()  # a parse process works on one page at a time, so this holds only this page's stages
+    download_list = DownloadList()
+    page_soup = PageVisitor(make_soup(plain, parser))  # parses the html once for the content and the links
+    page = Scraper.pages_info(plain, web_url, download_list, page_soup)
+    links = [str(link) for link in Scraper.page_links(page_soup)]
+    return page.to_dict(), links, download_list.downloads, time.perf_counter() - started, dict(metrics.stages)
+
+
+def fetch(web_url, cache=None):
+    """
+    Downloads the html for a page
+    :param web_url: The Url of the page
+    :param cache: optional HttpCache to revalidate against instead of always downloading the page, or a WarcArchive
+    to read the page from instead of the website
+    :return: The raw html as text, or None if the page is not in a WarcArchive
+    """
+    if cache is not None:
+        return cache.get(web_url)
+    result = get_transport().get(web_url, endpoint="pages")
+    return result.text  # raw html
@@ -0,0 +1,98 @@
+import csv
+import itertools
+
+# the columns of both CONTENTdm csv files
+CONTENTDM_COLUMNS = ["Title", "Alt. Title", "Identifier", "Creator", "Subject Keywords", "Subject", "Date",
+                     "Date Digitized", "Date Uploaded", "Date Accepted", "Publisher", "Contributors", "Type",
+                     "Format", "Source", "Language", "Relation", "Coverage Spatial", "Coverage Temporal",
+                     "Rights", "Audience", "Description", "Transcript", "Originating Institution", "Filename"]
+# the bibliography row that goes in each CONTENTdm column, "" leaves the column empty
+BIBLIOGRAPHY_HEADERS = ["Title", "Alt. Title", "Identifier", "Alt. Creator",
+                        "Subject Keyword", "Subject LCSH", "Date", "Date digital", "", "Acquisition",
+                        "Publisher", "Contributor", "Type", "Format", "Source", "Language", "Relation",
+                        "Coverage Spatial", "Coverage Temporal", "Rights", "", "Description",
+                        "Creator"]
+
+
+def clean_tags(text):
+    """
+    Cleans up a list of descriptive tags separated by semicolons
+    :param text: The tags as they appear on the page
+    :return: The tags longer than 2 characters without surrounding spaces, each followed by ", "
+    """
+    tags = ""
+    for descr_tag in text.split(";"):  # for each descriptive tag
+        if descr_tag:  # if the descriptive tag is not blank
+            cleaned_tag = descr_tag.replace(u'\xa0', u' ')  # replace "NBSP" with an actual space
+            if len(cleaned_tag) > 2:  # if the tag is bigger than 2 characters
+                cleaned_tag = cleaned_tag.strip(" ")
+                if cleaned_tag:
+                    tags += cleaned_tag + ", "  # concatenate the tag to a string
+    return tags
+
+
+def image_row(image, identifier):
+    """
+    :param image: A PMSS_Image object
+    :param identifier: The CONTENTdm identifier of the image
+    :return: The image's row in the images csv file
+    """
+    return [image.file_name, "", identifier, "Unknown", image.tags, "", "",
+            image.upload_date, image.upload_date, "Image", "",
+            "Helen Hayes Wykle & Ann Angel Eberhardt", "",
+            "", "", "", "", "", "",
+            "All rights reserved, Pine Mountain Settlement School", "", image.caption, image.transcription,
+            "Pine Mountain Settlement School", image.file_name]
+
+
+def bibliography_row(bib, identifier):
+    """
+    :param bib: A dictionary with a bibliography's row titles as the keys
+    :param identifier: The CONTENTdm identifier of the bibliography
+    :return: The bibliography's row in the bibliographies csv file
+    """
+    replaced = {"Identifier": identifier}
+    if "Subject Keyword" in bib:
+        replaced["Subject Keyword"] = clean_tags(bib["Subject Keyword"])
+    return [replaced[header] if header in replaced else bib.get(header, "") for header in BIBLIOGRAPHY_HEADERS]
+
+
+class CsvExport:
+    def __init__(self, packaged_names):
+        """
+        Writes the CONTENTdm csv files one row at a time
+        :param packaged_names: The file names, without extensions, of the images that were packaged for CONTENTdm
+        """
+        self.packaged_names = set(packaged_names)
+        self.identifiers = itertools.count()  # every row in both files gets the next identifier
+
+    def write_images(self, file_path, images):
+        """
+        Writes a row for every image that was packaged
+        :param file_path: Where the images csv file is written
+        :param images: The master list of all images that were scraped
+        :return: How many images were left out because they were not packaged
+        """
+        removed = 0
+        with open(file_path, 'w') as csvfile:
+            file_writer = csv.writer(csvfile)
+            file_writer.writerow(CONTENTDM_COLUMNS)  # the first row are the column headings
+            for image in images:
+                if image in self.packaged_names:
+                    file_writer.writerow(image_row(images[image], next(self.identifiers)))
+                else:
+                    removed += 1
+        return removed
+
+    def write_bibliographies(self, file_path, bibliographies):
+        """
+        Writes a row for every bibliography
+        :param file_path: Where the bibliographies csv file is written
+        :param bibliographies: The master list of all bibliographies that were scraped
+        :return: None
+        """
+        with open(file_path, 'w') as csvfile:
+            bib_file_writer = csv.writer(csvfile)
+            bib_file_writer.writerow(CONTENTDM_COLUMNS)
+            for bib in bibliographies:
+                bib_file_writer.writerow(bibliography_row(bib, next(self.identifiers)))
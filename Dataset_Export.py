@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import Paths
+from PMSS_Image import plain
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # Parquet files are optional, the SQLite database is always written
+    pyarrow = None
+    parquet = None
+
+SCHEMA = """
+    DROP TABLE IF EXISTS images;
+    DROP TABLE IF EXISTS url_sources;
+    DROP TABLE IF EXISTS alt_captions;
+    DROP TABLE IF EXISTS bibliographies;
+    DROP TABLE IF EXISTS guide_pages;
+    CREATE TABLE images (
+        image_key TEXT PRIMARY KEY,
+        file_name TEXT,
+        caption TEXT,
+        transcription TEXT,
+        upload_date TEXT,
+        width TEXT,
+        height TEXT,
+        tags TEXT,
+        caption_link TEXT
+    );
+    CREATE TABLE url_sources (
+        image_key TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        PRIMARY KEY (image_key, position)
+    );
+    CREATE TABLE alt_captions (
+        image_key TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        caption TEXT,
+        PRIMARY KEY (image_key, position)
+    );
+    CREATE TABLE bibliographies (
+        bibliography_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        value TEXT,
+        PRIMARY KEY (bibliography_id, title)
+    );
+    CREATE TABLE guide_pages (
+        url TEXT PRIMARY KEY
+    );
+    CREATE INDEX images_file_name ON images (file_name);
+    CREATE INDEX images_upload_date ON images (upload_date);
+    CREATE INDEX url_sources_url ON url_sources (url);
+    CREATE INDEX bibliographies_title ON bibliographies (title, value);
+"""
+# the columns of every table, in the order they are inserted
+TABLES = {"images": ["image_key", "file_name", "caption", "transcription", "upload_date", "width", "height", "tags",
+                     "caption_link"],
+          "url_sources": ["image_key", "position", "url"],
+          "alt_captions": ["image_key", "position", "caption"],
+          "bibliographies": ["bibliography_id", "title", "value"],
+          "guide_pages": ["url"]}
+
+
+class DatasetExport:
+    def __init__(self, db_path=None, batch_size=1000):
+        """
+        Saves the scrape's results in a SQLite database so they can be queried without reading the text reports.
+        Every run replaces the tables from the last run.
+        :param db_path: The file the database is stored in, Paths.DATASET by default
+        :param batch_size: How many rows are inserted at once
+        """
+        self.db_path = db_path or Paths.DATASET
+        self.batch_size = batch_size
+        # the transaction is started and ended by write itself, since the sqlite3 module would commit before the
+        # tables are dropped
+        self.connection = sqlite3.connect(self.db_path, isolation_level=None)
+
+    def write(self, bibliographies, images, guide_pages):
+        """
+        Replaces the database's tables with the master lists
+        :param bibliographies: The master list of all bibliographies
+        :param images: The master list of all images
+        :param guide_pages: A list of all the guide page urls
+        :return: None
+        """
+        # one transaction, so a failed export leaves the last run's tables as they were
+        self.connection.execute("BEGIN")
+        try:
+            for statement in SCHEMA.split(";"):  # executescript would commit first, so each statement runs on its own
+                if statement.strip():
+                    self.connection.execute(statement)
+            self.insert("images", ([image, plain(images[image].file_name), plain(images[image].caption),
+                                    plain(images[image].transcription), plain(images[image].upload_date),
+                                    plain(images[image].image_resized_resolution[0]),
+                                    plain(images[image].image_resized_resolution[1]), plain(images[image].tags),
+                                    plain(images[image].caption_link)] for image in images))
+            self.insert("url_sources", ([image, position, plain(url)] for image in images
+                                        for position, url in enumerate(images[image].url_sources)))
+            self.insert("alt_captions", ([image, position, plain(caption)] for image in images
+                                         for position, caption in enumerate(images[image].alt_captions)))
+            self.insert("bibliographies", ([bibliography_id, plain(title), plain(bib[title])]
+                                           for bibliography_id, bib in enumerate(bibliographies) for title in bib))
+            self.insert("guide_pages", ([plain(url)] for url in guide_pages))
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def insert(self, table, rows):
+        """
+        Inserts rows into a table batch_size rows at a time
+        :param table: The name of the table
+        :param rows: An iterable of rows with a value for each of the table's columns
+        :return: None
+        """
+        statement = "INSERT OR REPLACE INTO %s VALUES (%s)" % (table, ", ".join("?" * len(TABLES[table])))
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.connection.executemany(statement, batch)
+                batch = []
+        if batch:
+            self.connection.executemany(statement, batch)
+
+    def write_parquet(self, directory):
+        """
+        Copies every table into a Parquet file of the same name, batch_size rows at a time
+        :param directory: The directory the Parquet files are written to
+        :return: False if pyarrow is not installed, otherwise True
+        """
+        if parquet is None:
+            return False
+        Paths.ensure_dir(directory)
+        for table, columns in TABLES.items():
+            schema = pyarrow.schema([(column, pyarrow.int64() if column in ("position", "bibliography_id")
+                                      else pyarrow.string()) for column in columns])
+            cursor = self.connection.execute("SELECT %s FROM %s" % (", ".join(columns), table))
+            with parquet.ParquetWriter(os.path.join(directory, table + ".parquet"), schema) as writer:
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    writer.write_table(pyarrow.Table.from_arrays(
+                        [pyarrow.array([row[i] for row in rows], schema.field(i).type) for i in range(len(columns))],
+                        schema=schema))
+        return True
+
+    def close(self):
+        self.connection.close()
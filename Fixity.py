@@ -0,0 +1,206 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import Paths
+
+SLICE_SIZE = 64 * 1024 * 1024  # how much of a mapped file is handed to the hash at a time
+
+
+def file_sha256(file_path, chunk_size=8 * 1024 * 1024):
+    """
+    Hashes a file by mapping it into memory, so the operating system reads it ahead in large blocks and nothing is
+    copied into Python. Drives that cannot be mapped are read in large chunks instead.
+    :param file_path: The file to hash
+    :param chunk_size: How many bytes are read at a time when the file cannot be mapped
+    :return: The SHA-256 of the file as hex
+    """
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        try:
+            if size == 0:
+                raise ValueError("an empty file cannot be mapped")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                hasher.update(chunk)
+            return hasher.hexdigest()
+        try:
+            if hasattr(mapped, "madvise"):  # Python 3.8 and newer
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mapped) as view:
+                for start in range(0, size, SLICE_SIZE):
+                    hasher.update(view[start:start + SLICE_SIZE])
+        finally:
+            mapped.close()
+    return hasher.hexdigest()
+
+
+def hash_file(file_path):
+    """
+    Runs in a hashing process
+    :param file_path: The file to hash
+    :return: The file's path, size, modification time in nanoseconds and SHA-256, or None in place of the hash if the
+    file could not be read
+    """
+    try:
+        stat = os.stat(file_path)
+        return file_path, stat.st_size, stat.st_mtime_ns, file_sha256(file_path)
+    except OSError:
+        return file_path, 0, 0, None
+
+
+class Fixity:
+    def __init__(self, db_path=None, workers=None, checkpoint_every=100):
+        """
+        Keeps a SHA-256 manifest of the archive so corrupt and duplicate masters can be found. Files are hashed on a
+        pool of processes and a file whose size and modification time have not changed since it was hashed is not
+        read again, so an interrupted run picks up where it stopped.
+        :param db_path: The file the manifest is stored in, Paths.FIXITY by default
+        :param workers: How many processes hash files at the same time, the number of cores by default
+        :param checkpoint_every: How many hashed files to wait before saving the manifest to disk
+        """
+        self.db_path = db_path or Paths.FIXITY
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_every = checkpoint_every
+        # lookup can be called from the Packager's copy threads, which take turns using the connection
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS fixity (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                checked REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS fixity_sha256 ON fixity (sha256);
+        """)
+        self.connection.commit()
+        self.changed = []  # files whose contents changed even though their size and modification time did not
+
+    def lookup(self, file_path):
+        """
+        :param file_path: The absolute path of a file
+        :return: The file's SHA-256 from the manifest, or None if the file changed or was never hashed
+        """
+        row = self.connection.execute("SELECT size, mtime_ns, sha256 FROM fixity WHERE path = ?",
+                                      (file_path,)).fetchone()
+        if row is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return row[2] if (stat.st_size, stat.st_mtime_ns) == row[:2] else None
+
+    def to_hash(self, paths, audit=False):
+        """
+        :param paths: Absolute file paths
+        :param audit: If True, every file is hashed again to check that its contents did not change
+        :return: The paths that need to be hashed
+        """
+        if audit:
+            return list(paths)
+        known = {row[0]: row[1:] for row in self.connection.execute("SELECT path, size, mtime_ns FROM fixity")}
+        needed = []
+        for file_path in paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            if known.get(file_path) != (stat.st_size, stat.st_mtime_ns):
+                needed.append(file_path)
+        return needed
+
+    def update(self, paths, audit=False):
+        """
+        Hashes every file that is new or changed and saves the hashes in the manifest
+        :param paths: Absolute file paths
+        :param audit: If True, every file is hashed again and files whose contents changed without their size or
+        modification time changing are listed in self.changed
+        :return: How many files were hashed
+        """
+        needed = self.to_hash(paths, audit)
+        hashed = 0
+        pending = set()
+        remaining = iter(needed)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                # only a few files per process are queued at once so a drive with millions of files does not
+                # create millions of futures
+                for file_path in remaining:
+                    pending.add(executor.submit(hash_file, file_path))
+                    if len(pending) >= self.workers * 4:
+                        break
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self.record(*future.result())
+                    hashed += 1
+                    if hashed % self.checkpoint_every == 0:
+                        self.connection.commit()
+        self.connection.commit()
+        return hashed
+
+    def record(self, file_path, size, mtime_ns, digest):
+        if digest is None:
+            print(f"Could not read {file_path}")
+            return
+        row = self.connection.execute("SELECT size, mtime_ns, sha256 FROM fixity WHERE path = ?",
+                                      (file_path,)).fetchone()
+        if row and row[:2] == (size, mtime_ns) and row[2] != digest:
+            self.changed.append(file_path)  # the same size and time but different contents: the file is corrupt
+        self.connection.execute("INSERT OR REPLACE INTO fixity VALUES (?, ?, ?, ?, ?)",
+                                (file_path, size, mtime_ns, digest, time.time()))
+
+    def prune(self, paths):
+        """
+        Forgets files that are no longer on the drive
+        :param paths: Every file path that should stay in the manifest
+        :return: None
+        """
+        keep = set(paths)
+        gone = [(row[0],) for row in self.connection.execute("SELECT path FROM fixity") if row[0] not in keep]
+        self.connection.executemany("DELETE FROM fixity WHERE path = ?", gone)
+        self.connection.commit()
+
+    def duplicates(self):
+        """
+        :return: A list with a list of paths for every group of files that have exactly the same contents
+        """
+        groups = {}
+        rows = self.connection.execute(
+            "SELECT sha256, path FROM fixity WHERE sha256 IN "
+            "(SELECT sha256 FROM fixity GROUP BY sha256 HAVING count(*) > 1) ORDER BY sha256, path")
+        for digest, file_path in rows:
+            groups.setdefault(digest, []).append(file_path)
+        return list(groups.values())
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+def check_archive(index, audit=False):
+    """
+    Brings the fixity manifest of the archive's tifs up to date and reports duplicate and corrupt masters
+    :param index: ArchiveIndex with the archive in it
+    :param audit: If True, every tif is hashed again instead of only new and changed ones
+    :return: None
+    """
+    paths = [os.path.join(root, name) for root, name in index.files(Paths.PMSS_ARCHIVE, ".tif")]
+    fixity = Fixity()
+    fixity.prune(paths)
+    hashed = fixity.update(paths, audit)
+    duplicates = fixity.duplicates()
+    print(f"{hashed} of {len(paths)} tifs hashed, {len(duplicates)} groups of duplicate tifs, "
+          f"{len(fixity.changed)} tifs changed since they were last hashed")
+    for file_path in fixity.changed:
+        print(f"Changed: {file_path}")
+    for group in duplicates:
+        print("Duplicates: " + ", ".join(group))
+    fixity.close()
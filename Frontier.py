@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import Paths
+from Page import Page
+
+
+class Frontier:
+    def __init__(self, db_path=None, checkpoint_every=50):
+        """
+        Keeps the crawl's state in a SQLite database so an interrupted crawl can be resumed
+        :param db_path: The file the crawl state is stored in, Paths.FRONTIER by default
+        :param checkpoint_every: How many finished pages to wait before saving the state to disk
+        """
+        self.db_path = db_path or Paths.FRONTIER
+        self.checkpoint_every = checkpoint_every
+        self.changes = 0  # finished pages since the last checkpoint
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS links (
+                position INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                done INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                page TEXT NOT NULL
+            );
+        """)
+        # an in memory copy of every queued link so checking a link is O(1)
+        self.seen = {row[0] for row in self.connection.execute("SELECT url FROM links")}
+
+    def __contains__(self, url):
+        return url in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def add(self, url):
+        """
+        Records a link that has been queued to be crawled
+        :param url: The link to record
+        :return: None
+        """
+        if url not in self.seen:
+            self.seen.add(url)
+            self.connection.execute("INSERT OR IGNORE INTO links (url) VALUES (?)", (url,))
+
+    def mark_done(self, url, page):
+        """
+        Records that a page has been processed along with the information found on it
+        :param url: The link of the page
+        :param page: The Page object made from the link, or None if only its links were needed
+        :return: None
+        """
+        if page is not None:
+            self.connection.execute("INSERT OR REPLACE INTO pages (url, page) VALUES (?, ?)",
+                                    (url, json.dumps(page.to_dict())))
+        self.connection.execute("UPDATE links SET done = 1 WHERE url = ?", (url,))
+        self.changes += 1
+        if self.changes >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """
+        Saves everything recorded so far to disk
+        :return: None
+        """
+        self.connection.commit()
+        self.changes = 0
+
+    def visited(self):
+        """
+        :return: A list of every link that has been queued, in the order they were queued
+        """
+        return [row[0] for row in self.connection.execute("SELECT url FROM links ORDER BY position")]
+
+    def pending(self):
+        """
+        :return: A list of the links that were queued but have not been processed yet
+        """
+        return [row[0] for row in self.connection.execute("SELECT url FROM links WHERE done = 0 ORDER BY position")]
+
+    def pages(self):
+        """
+        :return: A Page object for every page that has been processed, one at a time
+        """
+        rows = self.connection.execute(
+            "SELECT pages.page FROM pages JOIN links ON links.url = pages.url ORDER BY links.position")
+        for row in rows:
+            yield Page.from_dict(json.loads(row[0]))
+
+    def reset(self):
+        """
+        Forgets the previous crawl so a new one can start
+        :return: None
+        """
+        self.connection.execute("DELETE FROM links")
+        self.connection.execute("DELETE FROM pages")
+        self.connection.commit()
+        self.seen = set()
+        self.changes = 0
+
+    def close(self):
+        self.checkpoint()
+        self.connection.close()
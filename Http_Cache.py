@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import tempfile
+from urllib.parse import urlsplit, urlunsplit
+import Paths
+from Transport import get_transport
+
+
+class HttpCache:
+    def __init__(self, cache_dir=None, transport=None):
+        """
+        Saves the pages downloaded from the website so later runs only download pages that have changed
+        :param cache_dir: The directory the cached pages are stored in, Paths.HTTP_CACHE by default
+        :param transport: The Transport used to download pages, the shared one by default
+        """
+        self.transport = transport or get_transport()
+        self.cache_dir = os.path.abspath(cache_dir or Paths.HTTP_CACHE)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0  # how many pages were reused because the server said they had not changed
+        self.misses = 0  # how many pages had to be downloaded
+
+    def entry_path(self, url):
+        """
+        Finds where the cached copy of a url is stored
+        :param url: The url of the page
+        :return: The path of the cache entry without an extension
+        """
+        key = hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, url):
+        """
+        Reads the cached copy of a page
+        :param url: The url of the page
+        :return: A tuple of the saved headers dictionary and the body as bytes, or (None, None) if nothing is saved
+        """
+        entry = self.entry_path(url)
+        try:
+            with open(entry + ".json") as meta_file:
+                meta = json.load(meta_file)
+            with open(entry + ".body", "rb") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):  # nothing is cached or the entry is broken
+            return None, None
+        return meta, body
+
+    def store(self, url, response):
+        """
+        Saves a downloaded page along with the headers needed to revalidate it later
+        :param url: The url of the page
+        :param response: The requests Response for the page
+        :return: None
+        """
+        entry = self.entry_path(url)
+        meta = {"url": canonical_url(url), "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"), "encoding": response.encoding}
+        # write to temporary files and rename them so a crash never leaves half of an entry behind; every write gets
+        # its own temporary files since urls that differ only by their fragment share an entry and can be fetched at
+        # the same time
+        body_handle, body_temp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        meta_handle, meta_temp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(body_handle, "wb") as body_file:
+                body_file.write(response.content)
+            with os.fdopen(meta_handle, "w") as meta_file:
+                json.dump(meta, meta_file)
+            os.replace(body_temp, entry + ".body")
+            os.replace(meta_temp, entry + ".json")
+        finally:
+            for temp_path in (body_temp, meta_temp):
+                if os.path.exists(temp_path):  # only left behind if the write failed
+                    os.remove(temp_path)
+
+    def get(self, url, headers=None):
+        """
+        Gets the html for a page, asking the server if the cached copy is still good before downloading it again
+        :param url: The url of the page
+        :param headers: Headers to send with the request
+        :return: The html as text
+        """
+        request_headers = dict(headers or {})
+        meta, body = self.load(url)
+        if meta:
+            if meta["etag"]:
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta["last_modified"]:
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+        response = self.transport.get(url, headers=request_headers, endpoint="pages")
+        if response.status_code == 304 and body is not None:  # the page has not changed since we saved it
+            self.hits += 1
+            if self.transport.archive is not None:  # archive the page that was used, not the empty 304
+                self.transport.archive.write_response(url, 200, "OK", cached_headers(meta), body)
+            return body.decode(meta["encoding"] or "utf-8", errors="replace")
+        self.misses += 1
+        if response.status_code == 200:
+            self.store(url, response)
+        return response.text
+
+
+def cached_headers(meta):
+    """
+    :param meta: The headers dictionary saved with a cached page
+    :return: The response headers that describe the cached page
+    """
+    headers = {"Content-Type": "text/html; charset=" + (meta["encoding"] or "utf-8")}
+    if meta["etag"]:
+        headers["ETag"] = meta["etag"]
+    if meta["last_modified"]:
+        headers["Last-Modified"] = meta["last_modified"]
+    return headers
+
+
+def canonical_url(url):
+    """
+    Puts a url in a standard form so the same page is always stored under the same key
+    :param url: The url to clean up
+    :return: The cleaned up url
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = parts.netloc.lower()
+    if (scheme == "https" and host.endswith(":443")) or (scheme == "http" and host.endswith(":80")):
+        host = host.rsplit(":", 1)[0]  # the default port is the same as no port
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))  # the fragment never reaches the server
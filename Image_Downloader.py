@@ -0,0 +1,185 @@
+import os
+import queue
+import threading
+import time
+from Transport import get_transport
+from Metrics import get_metrics
+
+
+class ByteBudget:
+    def __init__(self, limit):
+        """
+        Limits how many bytes of images can be downloading at the same time
+        :param limit: The most bytes that can be in flight at once
+        """
+        self.limit = limit
+        self.in_flight = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, size):
+        """
+        Waits until there is room for size more bytes and then reserves them
+        :param size: How many bytes to reserve
+        :return: The number of bytes that were reserved, which has to be given back to release
+        """
+        size = min(max(size, 1), self.limit)  # a file larger than the whole budget gets the whole budget
+        with self.condition:
+            while self.in_flight + size > self.limit:
+                self.condition.wait()
+            self.in_flight += size
+        return size
+
+    def resize(self, held, size):
+        """
+        Swaps a reservation for a larger one. The old reservation is given back while waiting, so two downloads that
+        both need more room can never wait on each other.
+        :param held: How many bytes are reserved now, as returned by acquire or resize
+        :param size: How many bytes are needed
+        :return: The number of bytes that are reserved now, which has to be given back to release
+        """
+        size = min(max(size, 1), self.limit)
+        with self.condition:
+            self.in_flight -= held
+            self.condition.notify_all()
+            while self.in_flight + size > self.limit:
+                self.condition.wait()
+            self.in_flight += size
+        return size
+
+    def release(self, size):
+        with self.condition:
+            self.in_flight -= size
+            self.condition.notify_all()
+
+
+class ImageDownloader:
+    def __init__(self, workers=8, max_bytes_in_flight=256 * 1024 * 1024, chunk_size=1024 * 1024, transport=None,
+                 store=None):
+        """
+        A pool of threads that downloads images in the background so parsing pages never waits on them
+        :param workers: How many images can download at the same time
+        :param max_bytes_in_flight: The most bytes of images that can be downloading at the same time
+        :param chunk_size: How many bytes are read and written at a time
+        :param transport: The Transport used to download images, the shared one by default
+        :param store: Optional ImageStore so each image is only downloaded and saved once
+        """
+        self.workers = workers
+        self.budget = ByteBudget(max_bytes_in_flight)
+        self.chunk_size = chunk_size
+        self.transport = transport or get_transport()
+        self.store = store
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.queued_paths = set()  # files that are already queued so they are not downloaded twice
+        self.lock = threading.Lock()
+        self.downloaded = 0  # how many images were saved
+        self.failed = 0  # how many images could not be saved
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self.work, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, src, file_path):
+        """
+        Queues an image to be downloaded
+        :param src: The URL of the image
+        :param file_path: The absolute path the image will be saved to
+        :return: None
+        """
+        with self.lock:
+            if file_path in self.queued_paths:
+                return
+            self.queued_paths.add(file_path)
+        self.jobs.put((src, file_path))
+
+    def close(self):
+        """
+        Waits for every queued image to finish downloading and stops the threads
+        :return: None
+        """
+        for _ in self.threads:
+            self.jobs.put(None)  # tells a thread there is no more work
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        print(f"{self.downloaded} images downloaded, {self.failed} images failed")
+
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            src, file_path = job
+            try:
+                if self.store is not None:
+                    saved = self.store.save(src, file_path, self.transport, self.budget, self.chunk_size)
+                else:
+                    saved = stream_to_file(src, file_path, self.transport, self.budget, self.chunk_size)
+                with self.lock:
+                    if saved:
+                        self.downloaded += 1
+                    else:
+                        self.failed += 1
+            except Exception as error:  # one bad image should not stop the rest from downloading
+                with self.lock:
+                    self.failed += 1
+                print(f"Could not download {src}: {error}")
+
+
+def stream_to_file(src, file_path, transport, budget=None, chunk_size=1024 * 1024, digest=None):
+    """
+    Downloads an image a chunk at a time into a temporary file and renames it once it is complete
+    :param src: The URL of the image
+    :param file_path: The absolute path the image will be saved to
+    :param transport: The Transport used to download the image
+    :param budget: Optional ByteBudget limiting how many bytes can be downloading at once
+    :param chunk_size: How many bytes are read and written at a time
+    :param digest: Optional hashlib object that is updated with the image's bytes as they are written
+    :return: True if the image was saved, False if the server answered with an error or a web page instead
+    """
+    started = time.monotonic()
+    response = transport.get(src, stream=True, endpoint="images")
+    reserved = 0
+    received = 0
+    temp_path = file_path + ".part"
+    try:
+        # an error page is not an image, and once stored it would be reused for the url on every later run
+        if not response.ok or response.headers.get("Content-Type", "").startswith("text/html"):
+            return False
+        known_size = True
+        if budget is not None:
+            try:
+                size = int(response.headers.get("Content-Length"))
+            except (TypeError, ValueError):  # the server did not say how large the image is
+                size = chunk_size
+                known_size = False
+            reserved = budget.acquire(size)
+        with open(temp_path, "wb") as image_file:
+            for chunk in response.iter_content(chunk_size):
+                image_file.write(chunk)  # writes the image data in to the file
+                if digest is not None:
+                    digest.update(chunk)
+                transport.record_bytes("images", len(chunk))
+                received += len(chunk)
+                if not known_size and reserved < budget.limit and received + chunk_size > reserved:
+                    # room for the next chunk is reserved before it is read, doubling so a large image only waits a
+                    # few times
+                    reserved = budget.resize(reserved, max(2 * reserved, received + chunk_size))
+        os.replace(temp_path, file_path)  # the image only shows up under its real name once it is complete
+        get_metrics().record_download(received, time.monotonic() - started)
+        return True
+    finally:
+        response.close()
+        if reserved:
+            budget.release(reserved)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
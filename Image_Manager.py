@@ -1,12 +1,237 @@
 import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+import Paths
+from Archive_Index import open_index
+
+try:
+    from PIL import Image
+    # the archive masters are our own scans and many are larger than Pillow's default limit, which is meant for
+    # images from strangers, so only a file far larger than any scan is refused
+    Image.MAX_IMAGE_PIXELS = 1024 * 1024 * 1024
+    # what Pillow raises for a file it cannot decode, or one that is still too large
+    DECODE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+except ImportError:  # content matching needs Pillow; matching by name works without it
+    Image = None
+    DECODE_ERRORS = (OSError, ValueError, SyntaxError)
+
+HASH_SIZE = 8  # the difference hash compares a 9x8 grayscale thumbnail, giving 64 bits
 
 
 def dir_dive():
-    os.chdir("/Volumes/Elements/PMSS_ARCHIVE")
-    for root, dirs, files in os.walk(".", topdown=False):
-        for name in files:
-            if name[-4:] == ".tif":
-                print(name)
+    index = open_index(Paths.PMSS_ARCHIVE)
+    for root, name in index.files(Paths.PMSS_ARCHIVE):
+        if name[-4:] == ".tif":
+            print(name)
+
+
+def open_small(file_path, target):
+    """
+    Opens an image decoding as little of it as possible: JPEGs are decoded at 1/2, 1/4 or 1/8 of their size, a tif
+    that stores smaller copies of itself uses the smallest one that is still big enough, and anything else is
+    shrunk by a whole factor before it is resized
+    :param file_path: The image file
+    :param target: The smallest width and height that is still useful
+    :return: A PIL Image
+    """
+    image = Image.open(file_path)
+    image.draft("L", (target, target))  # only does something for JPEGs
+    best = None
+    for frame in range(getattr(image, "n_frames", 1)):  # pyramid tifs keep reduced copies in later pages
+        image.seek(frame)
+        if min(image.size) >= target and (best is None or image.size[0] < best[1][0]):
+            best = (frame, image.size)
+    image.seek(best[0] if best is not None else 0)
+    factor = min(image.size) // target
+    if factor > 1 and hasattr(image, "reduce"):  # Pillow 7 and newer
+        try:
+            # shrinking before converting to grayscale means a master is not copied again at full size
+            image = image.reduce(factor)
+        except ValueError:  # palette, bilevel and 16 bit images cannot be reduced until they are converted
+            image = image.convert("L").reduce(factor)
+    return image.convert("L")
+
+
+def difference_hash(file_path, hash_size=HASH_SIZE):
+    """
+    Makes a perceptual hash that stays the same when an image is resized, recompressed or saved in another format,
+    by recording whether each pixel of a tiny grayscale copy is brighter than the pixel to its right
+    :param file_path: The image file
+    :param hash_size: The height of the thumbnail; the hash has hash_size * hash_size bits
+    :return: The hash as an int
+    """
+    image = open_small(file_path, hash_size * 8)
+    pixels = list(image.resize((hash_size + 1, hash_size), Image.BILINEAR).getdata())
+    value = 0
+    for row in range(hash_size):
+        for column in range(hash_size):
+            left = pixels[row * (hash_size + 1) + column]
+            value = (value << 1) | (left > pixels[row * (hash_size + 1) + column + 1])
+    return value
+
+
+def hash_image(file_path):
+    """
+    Runs in a hashing process
+    :param file_path: The image file
+    :return: The file's path, size, modification time in nanoseconds and perceptual hash, or None in place of the
+    hash if the file could not be read as an image
+    """
+    try:
+        stat = os.stat(file_path)
+        return file_path, stat.st_size, stat.st_mtime_ns, difference_hash(file_path)
+    except DECODE_ERRORS:  # one unreadable or oversized file should not stop the rest from being hashed
+        return file_path, 0, 0, None
+
+
+def hamming(first, second):
+    return bin(first ^ second).count("1")
+
+
+class BKTree:
+    def __init__(self):
+        """
+        A Burkhard-Keller tree that finds every hash within a Hamming distance of another hash without comparing it
+        to all of them. Each child is stored under its distance from its parent, so a search only follows the
+        children whose distance could be within range.
+        """
+        self.root = None  # [hash, items, {distance: child}]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value, item):
+        """
+        :param value: A perceptual hash
+        :param item: What the hash belongs to
+        :return: None
+        """
+        self.count += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:  # the same hash, so the items share a node
+                node[1].append(item)
+                return
+            if distance not in node[2]:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = node[2][distance]
+
+    def search(self, value, radius):
+        """
+        :param value: A perceptual hash
+        :param radius: The largest Hamming distance to include
+        :return: A list of (distance, item) pairs for every hash within radius, closest first
+        """
+        found = []
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            node = nodes.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:  # the triangle inequality
+                    nodes.append(child)
+        return sorted(found)
+
+
+class ContentMatcher:
+    def __init__(self, cache_path=None, workers=None, max_distance=6):
+        """
+        Matches scraped images to archive tifs by what they look like instead of by name, for images that were
+        renamed when they were uploaded. The hashes are kept in a SQLite file and a file is only hashed again if its
+        size or modification time changed.
+        :param cache_path: The file the hashes are stored in, Paths.PERCEPTUAL_HASHES by default
+        :param workers: How many processes hash images at the same time, the number of cores by default
+        :param max_distance: The largest Hamming distance between two hashes of the same picture
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_distance = max_distance
+        self.connection = sqlite3.connect(cache_path or Paths.PERCEPTUAL_HASHES)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT
+            )""")
+        self.connection.commit()
+        self.ambiguous = {}  # scraped images that looked like more than one tif
+
+    @staticmethod
+    def available():
+        return Image is not None
+
+    def hashes(self, paths):
+        """
+        Finds the perceptual hash of every file, hashing only the files that are new or changed
+        :param paths: Absolute image paths
+        :return: A dictionary with the path as the key and the hash as the value, for every file that is an image
+        """
+        cached = {row[0]: row[1:] for row in self.connection.execute("SELECT path, size, mtime_ns, hash FROM hashes")}
+        found = {}
+        needed = []
+        for file_path in paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            row = cached.get(file_path)
+            if row and row[:2] == (stat.st_size, stat.st_mtime_ns):
+                if row[2] is not None:
+                    found[file_path] = int(row[2], 16)
+            else:
+                needed.append(file_path)
+        if needed:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for file_path, size, mtime_ns, value in executor.map(hash_image, needed, chunksize=16):
+                    # the hash is stored as hex since SQLite integers are signed 64 bit
+                    self.connection.execute("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)",
+                                            (file_path, size, mtime_ns, None if value is None else "%x" % value))
+                    if value is not None:
+                        found[file_path] = value
+            self.connection.commit()
+        return found
+
+    def match_images(self, images, scraped_files, tif_files):
+        """
+        Finds the archive tif for every scraped image that looks like exactly one tif
+        :param images: Dictionary that stores all of the images, by image key
+        :param scraped_files: A dictionary with the image key as the key and the scraped file's path as the value, for
+        the images that still need a tif
+        :param tif_files: The paths of the archive tifs
+        :return: A dictionary with the image key as the key and the tif's file name as the value
+        """
+        tree = BKTree()
+        for file_path, value in self.hashes(tif_files).items():
+            tree.add(value, file_path)
+        scraped_hashes = self.hashes(scraped_files.values())
+        matched_items = {}
+        for image in scraped_files:
+            value = scraped_hashes.get(scraped_files[image])
+            if value is None:
+                continue
+            candidates = tree.search(value, self.max_distance)
+            if not candidates:
+                continue
+            closest = [file_path for distance, file_path in candidates if distance == candidates[0][0]]
+            if len(closest) > 1:  # do not guess which archive file is the right one
+                self.ambiguous[images[image].file_name] = closest
+            else:
+                matched_items[image] = os.path.basename(closest[0])
+        print(f"{len(matched_items)} more pictures were replaced with the \"tif\" they look like")
+        if self.ambiguous:
+            print(f"{len(self.ambiguous)} pictures looked like more than one \"tif\" and were not replaced")
+        return matched_items
+
+    def close(self):
+        self.connection.close()
 
 
 def main():
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import uuid
+from Image_Downloader import stream_to_file
+
+RESOLUTION_SUFFIX = re.compile(r"-\d+x\d+(?=\.[A-Za-z0-9]+$)")  # the "-300x200" WordPress adds to resized images
+
+
+class ImageStore:
+    def __init__(self, root, index_path=None):
+        """
+        Saves every image once under its SHA-256 hash and links the dated folders to those copies
+        :param root: The directory the images are stored in
+        :param index_path: The SQLite file that remembers which url has which hash, inside root by default
+        """
+        self.root = os.path.abspath(root)
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.temp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.connection = sqlite3.connect(index_path or os.path.join(self.root, "index.sqlite3"),
+                                          check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self.connection.commit()
+        self.lock = threading.Lock()  # the store is used by all of the download threads
+        self.fetched = 0  # images that had to be downloaded
+        self.reused = 0  # images whose url was already in the store so nothing was downloaded
+        self.duplicates = 0  # downloaded images whose contents were already in the store under another url
+
+    def blob_path(self, digest):
+        """
+        :param digest: The SHA-256 of an image as hex
+        :return: Where the image with that hash is stored
+        """
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def lookup(self, src):
+        """
+        Finds the hash of an image that has already been stored
+        :param src: The URL of the image
+        :return: The SHA-256 as hex, or None if the image has not been stored
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT sha256 FROM urls WHERE url = ?",
+                                          (canonical_image_url(src),)).fetchone()
+        if row and os.path.exists(self.blob_path(row[0])):
+            return row[0]
+        return None
+
+    def save(self, src, file_path, transport, budget=None, chunk_size=1024 * 1024):
+        """
+        Makes sure the image is stored and linked at file_path, downloading it only if the store does not have it
+        :param src: The URL of the image
+        :param file_path: The absolute path in the dated folders the image should appear at
+        :param transport: The Transport used to download the image
+        :param budget: Optional ByteBudget limiting how many bytes can be downloading at once
+        :param chunk_size: How many bytes are read and written at a time
+        :return: True if the image is now at file_path
+        """
+        digest = self.lookup(src)
+        if digest:
+            with self.lock:
+                self.reused += 1
+            self.link(digest, file_path)
+            return True
+        temp_path = os.path.join(self.temp_dir, uuid.uuid4().hex)
+        original = canonical_image_url(src)
+        hasher = hashlib.sha256()
+        # ask for the full size original first; only use the url as given if the original cannot be found
+        if not stream_to_file(original, temp_path, transport, budget, chunk_size, hasher):
+            if original == src:
+                return False
+            hasher = hashlib.sha256()
+            if not stream_to_file(src, temp_path, transport, budget, chunk_size, hasher):
+                return False
+        digest = hasher.hexdigest()
+        size = os.path.getsize(temp_path)
+        blob = self.blob_path(digest)
+        with self.lock:
+            self.fetched += 1
+            if os.path.exists(blob):  # the same image was already saved from a different url
+                self.duplicates += 1
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(temp_path, blob)
+            self.connection.execute("INSERT OR REPLACE INTO urls (url, sha256, size) VALUES (?, ?, ?)",
+                                    (canonical_image_url(src), digest, size))
+            self.connection.commit()
+        self.link(digest, file_path)
+        return True
+
+    def link(self, digest, file_path):
+        """
+        Makes the stored image show up at file_path with a hard link, falling back to a symbolic link or a copy on
+        drives that do not support links
+        :param digest: The SHA-256 of the image as hex
+        :param file_path: Where the image should appear
+        :return: None
+        """
+        if os.path.lexists(file_path):
+            return
+        blob = self.blob_path(digest)
+        try:
+            os.link(blob, file_path)
+        except OSError:
+            try:
+                os.symlink(blob, file_path)
+            except OSError:
+                shutil.copyfile(blob, file_path)
+
+    def close(self):
+        print(f"{self.fetched} images fetched, {self.reused} reused from the store, "
+              f"{self.duplicates} duplicates not stored again")
+        self.connection.close()
+
+
+def canonical_image_url(src):
+    """
+    Removes the resolution WordPress adds to resized copies so every size of an image shares one url
+    :param src: The URL of the image
+    :return: The URL of the original image
+    """
+    return RESOLUTION_SUFFIX.sub("", src.split("?")[0].split("#")[0])
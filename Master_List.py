@@ -0,0 +1,80 @@
+import Similarity
+
+DUPLICATE_CUTOFF = .80  # captions of the same image more similar than this are duplicates, not alternate captions
+
+
+class MasterList:
+    def __init__(self):
+        """
+        Combines the images, bibliographies and guide pages of many pages into one master list. The captions are only
+        compared with each other once every page has been added, in results.
+        """
+        self.images = {}  # the first image found for every file key, in the order they were found
+        self.first_urls = {}  # the url of the page each image was first found on
+        self.sightings = {}  # every later time an image was found with a caption, as (url, caption) pairs
+        self.occurrences = {}  # how many pages each image was found on
+        self.bibliographies = []  # List that will contain all the bibliographies
+        self.guide_pages = []  # List that will contain all the URLs for the guide pages
+
+    def __len__(self):
+        return len(self.images)
+
+    def add_page(self, page):
+        """
+        Adds a page's images, bibliography and guide url to the master list
+        :param page: A Page object
+        :return: None
+        """
+        for image in page.images.keys():  # for each image in the pages dictionary of images
+            if image in self.images:  # the image was already found on another page
+                if page.images[image].caption:
+                    self.sightings[image].append((page.url, page.images[image].caption))
+                self.occurrences[image] += 1
+            else:
+                self.images[image] = page.images[image]
+                self.first_urls[image] = page.url
+                self.sightings[image] = []
+                self.occurrences[image] = 1
+        if page.bibliography:  # if there is a bibliography for the page
+            self.bibliographies.append(page.bibliography)
+        if page.is_guide:  # if this is a GUIDE page
+            self.guide_pages.append(page.url)
+
+    def results(self):
+        """
+        Decides which later captions of every image are duplicates and which are alternate captions, and counts
+        everything that was found. Call this once, after every page has been added.
+        :return: Complete list of all the bibliographies, all of the images, and list of guide pages, followed by
+        the transcript, caption, duplicate, alternate caption and no caption counters
+        """
+        transcript_counter = 0
+        caption_counter = 0
+        duplicate_counter = 0
+        alt_captions_counter = 0
+        no_caption_counter = 0
+
+        for image in self.images:
+            master = self.images[image]
+            master.url_sources.append(self.first_urls[image])
+            if master.caption:
+                caption_counter += 1
+            for url, caption in self.sightings[image]:
+                if master.caption:
+                    if master.caption == caption:
+                        duplicate_counter += 1
+                    elif Similarity.ratio(caption, master.caption, DUPLICATE_CUTOFF) > DUPLICATE_CUTOFF:
+                        duplicate_counter += 1
+                    else:
+                        master.alt_captions.append(caption)  # add current caption to alt captions
+                        alt_captions_counter += 1
+                else:
+                    master.caption = caption
+                master.url_sources.append(url)
+                caption_counter += 1
+            if master.transcription:
+                transcript_counter += self.occurrences[image]  # counted once for every page the image is on
+            if not master.caption:
+                no_caption_counter += 1
+        return self.bibliographies, self.images, self.guide_pages, transcript_counter, \
+            caption_counter, duplicate_counter, alt_captions_counter, no_caption_counter
+
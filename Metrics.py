@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def percentile(values, fraction):
+    """
+    :param values: A sorted list of numbers
+    :param fraction: Which percentile to find, between 0 and 1
+    :return: The value at that percentile, or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summary(values):
+    """
+    :param values: A list of numbers
+    :return: A dictionary with the count, total, mean, median, 95th percentile and max of the values
+    """
+    values = sorted(values)
+    total = sum(values)
+    return {"count": len(values), "total": total, "mean": total / len(values) if values else 0.0,
+            "p50": percentile(values, .50), "p95": percentile(values, .95), "max": values[-1] if values else 0.0}
+
+
+def label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Collects how long every stage of a run took, how long each page took to fetch and parse, and how fast the
+        images downloaded, and writes it all as a JSON run report or in the Prometheus text format
+        """
+        self.started = time.time()
+        self.stages = {}  # a dictionary with the stage as the key and [seconds, calls] as the value
+        self.pages = {}  # a dictionary with the url as the key and its fetch and parse measurements as the value
+        self.download_bytes = 0  # bytes of images downloaded
+        self.download_seconds = 0.0  # seconds spent downloading images, summed over every download thread
+        self.downloads = 0  # images downloaded
+        self.lock = threading.Lock()  # pages are fetched and images downloaded on many threads
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the code inside a with block and adds it to the stage's total
+        :param name: The name of the stage
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def add_stage(self, name, seconds, calls=1):
+        with self.lock:
+            totals = self.stages.setdefault(name, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+
+    def merge_stages(self, stages):
+        """
+        Adds the stage totals measured somewhere else, like in a parse process
+        :param stages: A dictionary with the stage as the key and [seconds, calls] as the value
+        :return: None
+        """
+        for name in stages:
+            self.add_stage(name, stages[name][0], stages[name][1])
+
+    def record_fetch(self, url, seconds, size):
+        """
+        :param url: The url that was requested
+        :param seconds: How long the request took, including retries
+        :param size: How many bytes of body were received
+        :return: None
+        """
+        with self.lock:
+            page = self.pages.setdefault(url, {})
+            page["fetch_seconds"] = page.get("fetch_seconds", 0.0) + seconds
+            page["bytes"] = page.get("bytes", 0) + size
+
+    def record_parse(self, url, seconds):
+        """
+        :param url: The url of the page
+        :param seconds: How long it took to get the page's information and links from its html
+        :return: None
+        """
+        with self.lock:
+            self.pages.setdefault(url, {})["parse_seconds"] = seconds
+
+    def record_download(self, size, seconds):
+        """
+        :param size: How many bytes the image had
+        :param seconds: How long it took to download
+        :return: None
+        """
+        with self.lock:
+            self.download_bytes += size
+            self.download_seconds += seconds
+            self.downloads += 1
+
+    def report(self):
+        """
+        :return: Everything that was measured as a dictionary of plain values
+        """
+        with self.lock:
+            fetch_times = [page["fetch_seconds"] for page in self.pages.values() if "fetch_seconds" in page]
+            parse_times = [page["parse_seconds"] for page in self.pages.values() if "parse_seconds" in page]
+            return {
+                "started": self.started,
+                "run_seconds": time.time() - self.started,
+                "stages": {name: {"seconds": self.stages[name][0], "calls": self.stages[name][1]}
+                           for name in self.stages},
+                "fetch_seconds": summary(fetch_times),
+                "parse_seconds": summary(parse_times),
+                "bytes_fetched": sum(page.get("bytes", 0) for page in self.pages.values()),
+                "images": {"downloaded": self.downloads, "bytes": self.download_bytes,
+                           "seconds": self.download_seconds,
+                           "bytes_per_second": self.download_bytes / self.download_seconds
+                           if self.download_seconds else 0.0},
+                "pages": {url: dict(self.pages[url]) for url in self.pages},
+            }
+
+    def write_json(self, file_path):
+        """
+        Writes the run report as JSON
+        :param file_path: Where the report is written
+        :return: None
+        """
+        with open(file_path + ".part", "w") as report_file:
+            json.dump(self.report(), report_file, indent=1)
+        os.replace(file_path + ".part", file_path)
+
+    def prometheus(self):
+        """
+        :return: The measurements in the Prometheus text format, without the per-url details
+        """
+        report = self.report()
+        lines = ["# TYPE pmss_run_seconds gauge", f"pmss_run_seconds {report['run_seconds']}",
+                 "# TYPE pmss_stage_seconds_total counter"]
+        for name in sorted(report["stages"]):
+            lines.append(f"pmss_stage_seconds_total{{stage=\"{label(name)}\"}} {report['stages'][name]['seconds']}")
+        lines.append("# TYPE pmss_stage_calls_total counter")
+        for name in sorted(report["stages"]):
+            lines.append(f"pmss_stage_calls_total{{stage=\"{label(name)}\"}} {report['stages'][name]['calls']}")
+        for metric in ("fetch_seconds", "parse_seconds"):
+            values = report[metric]
+            lines.append(f"# TYPE pmss_page_{metric} summary")
+            lines.append(f"pmss_page_{metric}{{quantile=\"0.5\"}} {values['p50']}")
+            lines.append(f"pmss_page_{metric}{{quantile=\"0.95\"}} {values['p95']}")
+            lines.append(f"pmss_page_{metric}_sum {values['total']}")
+            lines.append(f"pmss_page_{metric}_count {values['count']}")
+        lines += ["# TYPE pmss_fetched_bytes_total counter", f"pmss_fetched_bytes_total {report['bytes_fetched']}",
+                  "# TYPE pmss_image_downloads_total counter",
+                  f"pmss_image_downloads_total {report['images']['downloaded']}",
+                  "# TYPE pmss_image_download_bytes_total counter",
+                  f"pmss_image_download_bytes_total {report['images']['bytes']}",
+                  "# TYPE pmss_image_download_seconds_total counter",
+                  f"pmss_image_download_seconds_total {report['images']['seconds']}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path):
+        """
+        Writes the measurements in the Prometheus text format, for example for node_exporter's textfile collector
+        :param file_path: Where the measurements are written
+        :return: None
+        """
+        with open(file_path + ".part", "w") as metrics_file:
+            metrics_file.write(self.prometheus())
+        os.replace(file_path + ".part", file_path)
+
+
+metrics = None  # the Metrics shared by the whole program
+
+
+def get_metrics():
+    """
+    Finds the shared Metrics, making it the first time it is needed
+    :return: The shared Metrics
+    """
+    global metrics
+    if metrics is None:
+        metrics = Metrics()
+    return metrics
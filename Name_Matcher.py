@@ -0,0 +1,136 @@
+import os
+import re
+import string
+import Similarity
+
+# one translate table that removes every punctuation mark and space in a single pass
+STRIP_TABLE = str.maketrans("", "", string.punctuation + string.whitespace)
+DIGIT_RUNS = re.compile(r"\d+")
+
+
+def strip_punctuation(name):
+    """
+    :param name: A file name
+    :return: The file name with all punctuation and spaces removed
+    """
+    return name.translate(STRIP_TABLE)
+
+
+def name_key(file_name):
+    """
+    The key a file is matched on: its name without the extension, punctuation or spaces
+    :param file_name: A file name
+    :return: The normalized key
+    """
+    return strip_punctuation(os.path.splitext(file_name)[0])
+
+
+def digit_runs(key):
+    """
+    :param key: A normalized file name key
+    :return: The numbers in the key, like the scan number, which have to be the same for two names to match
+    """
+    return DIGIT_RUNS.findall(key)
+
+
+class NameMatcher:
+    def __init__(self, extensions=(".tif",), fuzzy_cutoff=.90):
+        """
+        Matches the file names of images from the website to the files in the archive by building an index of the
+        archive once and looking every web image up in it
+        :param extensions: Only archive files with these extensions are indexed
+        :param fuzzy_cutoff: How similar two keys have to be to match when there is no exact match, None to turn off
+        """
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.index = {}  # a dictionary with the key as the key and a dictionary of file name to directory as the value
+        self.folded = {}  # the same keys ignoring case, with a list of the original keys as the value
+        self.buckets = {}  # keys grouped by their first character and length so fuzzy lookups only check a few keys
+        self.ambiguous = {}  # web file names that matched more than one archive file, with the archive file names
+        self.fuzzy_matches = {}  # web file names that only matched approximately, with the archive file names
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, file_name, directory=""):
+        """
+        Adds an archive file to the index
+        :param file_name: The archive file's name
+        :param directory: The directory the file is in
+        :return: None
+        """
+        if not file_name.lower().endswith(self.extensions):
+            return
+        key = name_key(file_name)
+        if key not in self.index:
+            self.index[key] = {}
+            self.folded.setdefault(key.lower(), []).append(key)
+            self.buckets.setdefault((key[:1].lower(), len(key)), []).append(key)
+        self.index[key][file_name] = directory
+
+    def add_directory(self, root):
+        """
+        Adds every file under a directory to the index
+        :param root: The directory to walk
+        :return: None
+        """
+        for directory, dirs, files in os.walk(root):
+            for name in files:
+                self.add(name, directory)
+
+    def lookup(self, file_name):
+        """
+        Finds the archive files that match a web file name
+        :param file_name: The web image's file name
+        :return: A tuple of a list of the matching archive file names and how they matched: "exact", "case", "fuzzy" or
+        "missing"
+        """
+        key = name_key(file_name)
+        if key in self.index:
+            return sorted(self.index[key]), "exact"
+        if key.lower() in self.folded:
+            return sorted(name for found in self.folded[key.lower()] for name in self.index[found]), "case"
+        if self.fuzzy_cutoff is None or not key:
+            return [], "missing"
+        # only keys that start with the same character and are close in length can reach the cutoff, and only keys
+        # with the same numbers can be the same scan; otherwise the next scan in a numbered series would match
+        numbers = digit_runs(key)
+        candidates = []
+        for length in range(len(key) - 2, len(key) + 3):
+            candidates.extend(candidate for candidate in self.buckets.get((key[:1].lower(), length), [])
+                              if digit_runs(candidate) == numbers)
+        ratios = Similarity.ratio_many(key.lower(), [candidate.lower() for candidate in candidates],
+                                       self.fuzzy_cutoff)
+        best = max(ratios, default=0)
+        if not best:
+            return [], "missing"
+        return sorted(name for candidate, ratio in zip(candidates, ratios) if ratio == best
+                      for name in self.index[candidate]), "fuzzy"
+
+    def match_images(self, images):
+        """
+        Finds the archive file for every web image
+        :param images: Dictionary that stores all of the images
+        :return: A dictionary with the image key as the key and the archive file name as the value for every image that
+        matched exactly one archive file by name; approximate matches are only listed in self.fuzzy_matches so they can
+        be checked by hand
+        """
+        matched_items = {}
+        for image in images:
+            names, how = self.lookup(images[image].file_name)
+            if how == "fuzzy":  # a similar name is a guess, so it is reported instead of used
+                self.fuzzy_matches[images[image].file_name] = names
+            elif len(names) > 1:  # do not guess which archive file is the right one
+                self.ambiguous[images[image].file_name] = names
+            elif names:
+                matched_items[image] = names[0]
+        print(f"{len(matched_items)} pictures were replaced with their \"tif\" counterpart")
+        if self.fuzzy_matches:
+            print(f"{len(self.fuzzy_matches)} pictures only have a \"tif\" with a similar name and were not replaced:")
+            for file_name in sorted(self.fuzzy_matches):
+                print(f"    {file_name}: {', '.join(self.fuzzy_matches[file_name])}")
+        if self.ambiguous:
+            print(f"{len(self.ambiguous)} pictures matched more than one \"tif\" and were not replaced:")
+            for file_name in sorted(self.ambiguous):
+                print(f"    {file_name}: {', '.join(self.ambiguous[file_name])}")
+        return matched_items
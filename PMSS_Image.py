@@ -1,11 +1,18 @@
+import sys
+
+
 class PMSS_Image:
+    # a fixed set of attributes instead of a __dict__ keeps every image record small
+    __slots__ = ("file_name", "caption_link", "transcription", "upload_date", "caption", "url_sources", "alt_captions",
+                 "image_resized_resolution", "tags")
+
     def __init__(self):
         self.file_name = ""
         self.caption_link = ""
         self.transcription = ""
         self.upload_date = ""
         self.caption = ""
-        self.url_sources = ""
+        self.url_sources = []  # the url of every page the image was found on
         self.alt_captions = []
         self.image_resized_resolution = [0, 0]
         self.tags = ""
@@ -19,6 +26,37 @@ class PMSS_Image:
                f"\nTranscription: {self.transcription}\nUpload date: {self.upload_date}\n" \
                f"Tags: {self.tags}\n\n"
 
+    def to_dict(self):
+        """
+        Returns the image's information as plain values so it can be saved outside of the program
+        :return: a dictionary containing all of the class's variables
+        """
+        return {"file_name": plain(self.file_name), "caption_link": plain(self.caption_link),
+                "transcription": plain(self.transcription), "upload_date": plain(self.upload_date),
+                "caption": plain(self.caption), "url_sources": [plain(url) for url in self.url_sources],
+                "alt_captions": [plain(caption) for caption in self.alt_captions],
+                "image_resized_resolution": [plain(size) for size in self.image_resized_resolution],
+                "tags": plain(self.tags)}
+
+    @classmethod
+    def from_dict(cls, info):
+        """
+        Rebuilds an image from the dictionary made by to_dict
+        :param info: a dictionary containing the class's variables
+        :return: a PMSS_Image object
+        """
+        image = cls()
+        for attr in info:
+            setattr(image, attr, info[attr])
+        if isinstance(image.url_sources, str):  # saved before url_sources was a list
+            image.url_sources = image.url_sources.split()
+        # every saved copy of a string is read back as a new string, so the repeated ones are shared again like they
+        # were when the page was scraped
+        image.url_sources = [sys.intern(url) for url in image.url_sources]
+        image.upload_date = sys.intern(image.upload_date)
+        image.tags = sys.intern(image.tags)
+        return image
+
     def strip_resolution(self):
         """
         Uses the resolution information to clean up the filename
@@ -67,3 +105,14 @@ class PMSS_Image:
         if self.caption != "":
             print("Caption: " + self.caption)
 
+
+
+def plain(value):
+    """
+    Turns Beautiful Soup strings into regular strings so they do not hold on to the page they came from
+    :param value: a string or None
+    :return: a regular string or None
+    """
+    if value is None:
+        return None
+    return str(value)
@@ -0,0 +1,204 @@
+import os
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import Paths
+from Fixity import file_sha256
+
+# the checksum of every packaged file, one "<sha256>  <name>" line each; kept out of the CONTENTdm folder so the
+# folder only holds images
+MANIFEST_NAME = "manifest-sha256.txt"
+
+
+def plan_copies(images, index):
+    """
+    Decides which files go into the CONTENTdm folder before anything is copied: the scraped copy of every image that
+    is not a tif, and the archive tif of every image that is one
+    :param images: Dictionary that stores all of the images
+    :param index: ArchiveIndex with the scraped images and the archive in it
+    :return: A list of (source path, file name in the CONTENTdm folder) pairs, one per file name
+    """
+    planned = {}
+    for root, name in index.files(Paths.SCRAPED_IMAGES):
+        if name[:-4] in images:
+            if images[name[:-4]].file_name[-3:] != "tif":
+                planned.setdefault(name, os.path.join(root, name))  # the first copy found is used
+    all_filenames = {}
+    for root, name in index.files(Paths.PMSS_ARCHIVE):
+        all_filenames[name] = root
+    for image in images:
+        file_name = images[image].file_name
+        if file_name in all_filenames and file_name[-3:] == "tif":
+            planned.setdefault(file_name, os.path.join(all_filenames[file_name], file_name))
+    return [(planned[name], name) for name in planned]
+
+
+def fast_copy(source, destination):
+    """
+    Copies a file inside the kernel with copy_file_range where the system has it, which also lets file systems like
+    Btrfs and XFS share the blocks instead of copying them. Falls back to shutil, which uses the fastest copy the
+    system has (fcopyfile on macOS, sendfile on Linux).
+    :param source: The file to copy
+    :param destination: Where the copy is made
+    :return: None
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+                remaining = os.fstat(source_file.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(source_file.fileno(), destination_file.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return
+        except OSError:  # not supported between these file systems
+            pass
+    shutil.copyfile(source, destination)
+
+
+class Packager:
+    def __init__(self, destination, workers=4, link=False, manifest_path=None, checksum_path=None, fixity=None):
+        """
+        Copies files into the CONTENTdm folder on a pool of threads, checks every copy against the original's
+        SHA-256, and remembers what it packaged so running it again only copies what is missing or changed
+        :param destination: The CONTENTdm folder
+        :param workers: How many files are copied at the same time
+        :param link: If True, hard link files that are on the same drive instead of copying them. Off by default since
+        anything that changes a linked file in the CONTENTdm folder also changes the archive's original.
+        :param manifest_path: The SQLite file that remembers every packaged file, Paths.PACKAGE_MANIFEST by default
+        :param checksum_path: The text file the checksums are written to, manifest-sha256.txt in the results folder
+        by default
+        :param fixity: Optional Fixity whose hashes of the archive tifs are used instead of reading a tif again
+        """
+        self.destination = Paths.ensure_dir(destination)
+        self.workers = workers
+        self.link = link
+        self.checksum_path = checksum_path or Paths.results_path(MANIFEST_NAME)
+        self.fixity = fixity
+        self.connection = sqlite3.connect(manifest_path or Paths.PACKAGE_MANIFEST, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS packaged (
+                name TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                target_mtime_ns INTEGER
+            )""")
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(packaged)")]
+        if "target_mtime_ns" not in columns:  # a manifest from before the packaged copies' times were recorded
+            self.connection.execute("ALTER TABLE packaged ADD COLUMN target_mtime_ns INTEGER")
+        self.connection.commit()
+        self.lock = threading.Lock()  # the manifest and the counters are shared by the copy threads
+        self.counts = {"copied": 0, "linked": 0, "skipped": 0, "failed": 0}
+
+    def package(self, plan):
+        """
+        Packages every planned file and writes the checksum manifest
+        :param plan: A list of (source path, file name) pairs from plan_copies
+        :return: A dictionary counting how many files were copied, linked, skipped or failed
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for result in executor.map(lambda job: self.package_file(*job), plan):
+                with self.lock:
+                    self.counts[result] += 1
+        self.connection.commit()
+        self.write_manifest()
+        print(f"{self.counts['copied']} files copied, {self.counts['linked']} linked, "
+              f"{self.counts['skipped']} already packaged, {self.counts['failed']} failed")
+        return self.counts
+
+    def package_file(self, source, name):
+        """
+        Puts one file in the CONTENTdm folder unless an identical copy is already there
+        :param source: The file to package
+        :param name: The file's name in the CONTENTdm folder
+        :return: "copied", "linked", "skipped" or "failed"
+        """
+        target = os.path.join(self.destination, name)
+        try:
+            stat = os.stat(source)
+            with self.lock:
+                row = self.connection.execute("SELECT source, size, mtime_ns, sha256, target_mtime_ns FROM packaged "
+                                              "WHERE name = ?", (name,)).fetchone()
+            if row and row[:3] == (source, stat.st_size, stat.st_mtime_ns):
+                digest = row[3]  # the source has not changed since it was hashed
+            else:
+                digest = self.source_digest(source)
+            if os.path.exists(target) and os.path.getsize(target) == stat.st_size:
+                target_stat = os.stat(target)
+                # a copy is only trusted without hashing it if it has not been touched since it was packaged
+                if (row and row[3] == digest and row[4] == target_stat.st_mtime_ns) or file_sha256(target) == digest:
+                    self.record(name, source, stat, digest, target_stat.st_mtime_ns)
+                    return "skipped"
+            result = self.place(source, target, digest)
+            self.record(name, source, stat, digest, os.stat(target).st_mtime_ns)
+            return result
+        except OSError as error:
+            print(f"Could not package {name}: {error}")
+            return "failed"
+
+    def source_digest(self, source):
+        """
+        :param source: The file to package
+        :return: The file's SHA-256, from the fixity manifest if it has not changed since it was hashed there
+        """
+        if self.fixity is not None:
+            with self.lock:  # the fixity manifest's connection is shared by the copy threads too
+                digest = self.fixity.lookup(source)
+            if digest is not None:
+                return digest
+        return file_sha256(source)
+
+    def place(self, source, target, digest):
+        """
+        Links or copies a file into place through a temporary name so a half written file is never left behind
+        :param source: The file to package
+        :param target: Where it goes in the CONTENTdm folder
+        :param digest: The SHA-256 the packaged file has to have
+        :return: "copied" or "linked"
+        """
+        temp_path = target + ".part"
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        if self.link:
+            try:
+                os.link(source, temp_path)
+                os.replace(temp_path, target)
+                return "linked"  # the same file on disk, so there is nothing to check
+            except OSError:  # a different drive, or links are not supported
+                pass
+        fast_copy(source, temp_path)
+        shutil.copymode(source, temp_path)
+        if file_sha256(temp_path) != digest:
+            os.remove(temp_path)
+            raise OSError(f"the copy of {source} does not match the original")
+        os.replace(temp_path, target)
+        return "copied"
+
+    def record(self, name, source, stat, digest, target_mtime_ns):
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO packaged VALUES (?, ?, ?, ?, ?, ?)",
+                                    (name, source, stat.st_size, stat.st_mtime_ns, digest, target_mtime_ns))
+
+    def write_manifest(self):
+        """
+        Writes the checksum of every packaged file that is in the CONTENTdm folder
+        :return: None
+        """
+        stale = os.path.join(self.destination, MANIFEST_NAME)
+        if os.path.exists(stale):  # earlier runs wrote the manifest into the CONTENTdm folder
+            os.remove(stale)
+        manifest_path = self.checksum_path
+        with open(manifest_path + ".part", "w") as manifest:
+            for name, digest in self.connection.execute("SELECT name, sha256 FROM packaged ORDER BY name"):
+                if os.path.exists(os.path.join(self.destination, name)):
+                    manifest.write(f"{digest}  {name}\n")
+        os.replace(manifest_path + ".part", manifest_path)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -1,4 +1,10 @@
+import sys
+from PMSS_Image import PMSS_Image, plain
+
+
 class Page:
+    __slots__ = ("images", "bibliography", "url", "is_guide", "partial_bibliography")
+
     def __init__(self):
         self.images = {}  # A dictionary to contain the images from the web page
         self.bibliography = {}  # A dictionary to contain information in the bibiliography
@@ -10,3 +16,27 @@ class Page:
         if self.bibliography:
             for row_title in self.bibliography:
                 print(f"{row_title}: {self.bibliography[row_title]}")
+
+    def to_dict(self):
+        """
+        Returns the page's information as plain values so it can be saved outside of the program
+        :return: a dictionary containing all of the class's variables
+        """
+        return {"url": plain(self.url), "is_guide": self.is_guide, "partial_bibliography": self.partial_bibliography,
+                "bibliography": {plain(title): plain(self.bibliography[title]) for title in self.bibliography},
+                "images": {plain(key): self.images[key].to_dict() for key in self.images}}
+
+    @classmethod
+    def from_dict(cls, info):
+        """
+        Rebuilds a page from the dictionary made by to_dict
+        :param info: a dictionary containing the class's variables
+        :return: a Page object
+        """
+        page = cls()
+        page.url = sys.intern(info["url"])  # shared with the url_sources of the page's images
+        page.is_guide = info["is_guide"]
+        page.partial_bibliography = info["partial_bibliography"]
+        page.bibliography = {sys.intern(title): info["bibliography"][title] for title in info["bibliography"]}
+        page.images = {key: PMSS_Image.from_dict(info["images"][key]) for key in info["images"]}
+        return page
@@ -0,0 +1,112 @@
+import json
+import os
+from Page import Page
+
+
+class PageSink:
+    def __init__(self, file_path, resume=False):
+        """
+        Saves every page to a JSON lines file as soon as it has been scraped so the pages do not have to be kept in
+        memory until the crawl is over. The file can be read back one page at a time, during the same run or later,
+        without crawling the site again.
+        :param file_path: The file the pages are written to, one JSON object per line
+        :param resume: If True, keep the pages already in the file and add to them instead of starting a new file
+        """
+        self.file_path = file_path
+        self.urls = set()  # the url of every page in the file so a page is never written twice
+        if resume and os.path.exists(file_path):
+            for info in read_lines(self.file_path):
+                self.urls.add(info["url"])
+            self.file = open(file_path, "a", encoding="utf-8")
+            if self.file.tell() and not ends_with_newline(file_path):
+                self.file.write("\n")  # finish the line that was cut off so the next page starts on its own line
+        else:
+            self.file = open(file_path, "w", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __iter__(self):
+        """
+        :return: The saved pages as Page objects, one at a time, in the order they were scraped
+        """
+        self.file.flush()
+        return replay(self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, page):
+        """
+        Writes a page to the end of the file
+        :param page: A Page object
+        :return: None
+        """
+        info = page.to_dict()
+        if info["url"] in self.urls:  # the page was saved before the crawl was interrupted
+            return
+        self.urls.add(info["url"])
+        self.file.write(json.dumps(info) + "\n")
+        self.file.flush()  # a crash loses at most the page being written
+
+    def extend(self, pages):
+        for page in pages:
+            self.append(page)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class SavedPages:
+    def __init__(self, file_path):
+        """
+        The pages saved by an earlier crawl, read from the file without ever writing to it
+        :param file_path: A JSON lines file written by PageSink
+        """
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"{file_path} does not exist")
+        self.file_path = file_path
+        self.count = sum(1 for _ in read_lines(file_path))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """
+        :return: The saved pages as Page objects, one at a time, in the order they were scraped
+        """
+        return replay(self.file_path)
+
+
+def read_lines(file_path):
+    """
+    Reads a file written by PageSink one line at a time
+    :param file_path: A JSON lines file of pages
+    :return: The dictionary saved for each page
+    """
+    with open(file_path, encoding="utf-8") as pages_file:
+        for line in pages_file:
+            try:
+                yield json.loads(line)
+            except ValueError:  # the line was cut off when the program stopped
+                continue
+
+
+def ends_with_newline(file_path):
+    with open(file_path, "rb") as pages_file:
+        pages_file.seek(-1, os.SEEK_END)
+        return pages_file.read(1) == b"\n"
+
+
+def replay(file_path):
+    """
+    Reads the pages saved by an earlier crawl so the results can be made again without crawling the site
+    :param file_path: A JSON lines file written by PageSink
+    :return: The saved pages as Page objects, one at a time
+    """
+    for info in read_lines(file_path):
+        yield Page.from_dict(info)
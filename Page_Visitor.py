@@ -0,0 +1,32 @@
+EXTRACTED_TAGS = ("p", "dd", "img", "div", "article", "table", "a")  # every tag the extractors search a page for
+
+
+class PageVisitor:
+    def __init__(self, page_soup, tag_names=EXTRACTED_TAGS):
+        """
+        Walks a page's tree a single time and sorts every tag the extractors need by its name. The extractors call
+        find_all on the visitor exactly like they would on the Beautiful Soup object, but instead of scanning the
+        whole tree again they get the tags collected during the walk, in the same document order.
+        :param page_soup: A Beautiful Soup object
+        :param tag_names: The tag names to collect
+        """
+        self.page_soup = page_soup
+        self.tags = {name: [] for name in tag_names}
+        for node in page_soup.descendants:  # the one walk of the tree
+            found = self.tags.get(node.name)
+            if found is not None:
+                found.append(node)
+
+    def find_all(self, name, *args, **kwargs):
+        """
+        :param name: The name of the tags to find
+        :return: A list of every tag with that name on the page
+        """
+        if name in self.tags and not args and not kwargs:
+            return list(self.tags[name])
+        return self.page_soup.find_all(name, *args, **kwargs)  # anything that was not collected is searched for
+
+    findAll = find_all
+
+    def find(self, *args, **kwargs):
+        return self.page_soup.find(*args, **kwargs)
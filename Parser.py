@@ -0,0 +1,99 @@
+import os
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup, FeatureNotFound
+
+# The Beautiful Soup tree builder used for every page. "lxml" is much faster than "html.parser" but has to be
+# installed, and it can build a slightly different tree for broken html, so html.parser stays the default.
+PARSER = os.environ.get("PMSS_PARSER", "html.parser")
+# tags that never have children, so they never need to be closed
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track",
+             "wbr"}
+
+
+def make_soup(text, backend=None):
+    """
+    Parses a page's html once so the same tree can be used for finding links and for extracting the page's content
+    :param text: full html as plain text
+    :param backend: The Beautiful Soup tree builder to use, PARSER by default
+    :return: A Beautiful Soup object
+    """
+    backend = backend or PARSER
+    try:
+        return BeautifulSoup(text, backend)
+    except FeatureNotFound:  # the chosen parser is not installed
+        return BeautifulSoup(text, "html.parser")
+
+
+class LinkParser(HTMLParser):
+    def __init__(self):
+        """
+        Finds the same links as Scraper.page_links without building a tree, for pages whose content is not needed
+        """
+        super().__init__(convert_charrefs=True)
+        self.links = []  # the destinations found so far
+        self.stack = []  # the class attribute of every open tag, so a link's parent can be checked
+        self.pending = None  # a link that has been opened but whose first child has not been seen yet
+        self.done = False  # True once a link that ends the search has been found
+
+    def handle_starttag(self, tag, attrs):
+        if self.pending is not None:
+            self.first_child(tag)
+        if tag == "a" and not self.done:
+            attributes = dict(attrs)
+            if not attributes.get("class"):  # avoid the html tag with class
+                parent_class = self.stack[-1] if self.stack else None
+                self.pending = (attributes.get("href"), parent_class)
+        if tag not in VOID_TAGS:
+            self.stack.append(dict(attrs).get("class"))
+
+    def handle_startendtag(self, tag, attrs):
+        if self.pending is not None:
+            self.first_child(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self.pending = None  # the link was empty so it is ignored
+        if self.stack and tag not in VOID_TAGS:
+            self.stack.pop()
+
+    def handle_data(self, data):
+        if self.pending is not None:
+            self.first_child(None)
+
+    def handle_comment(self, data):
+        if self.pending is not None:
+            self.first_child(None)
+
+    def first_child(self, tag):
+        """
+        Decides what to do with the pending link once its first child is known
+        :param tag: The name of the first child's tag, or None if it is text
+        :return: None
+        """
+        links_destination, parent_class = self.pending
+        self.pending = None
+        if tag == "img" or self.done:  # the link is for an image
+            return
+        if parent_class and parent_class.split()[0] == "must-log-in":  # the link goes to a log in page
+            self.done = True
+            return
+        if not links_destination:
+            self.done = True
+            return
+        pieces = links_destination.split("/")
+        if len(pieces) > 3 and pieces[3] == "wp-admin":
+            self.done = True
+            return
+        self.links.append(links_destination)
+
+
+def fast_links(text):
+    """
+    Finds the links on a page without building a Beautiful Soup tree
+    :param text: full html as plain text
+    :return: A list of link destinations in the order they appear on the page
+    """
+    parser = LinkParser()
+    parser.feed(text)
+    parser.close()
+    return parser.links
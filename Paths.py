@@ -0,0 +1,64 @@
+import os
+import threading
+
+# Every directory the scraper reads from or writes to. Each one can be changed with an environment variable.
+SCRAPED_IMAGES = os.environ.get("PMSS_SCRAPED_IMAGES", "/Volumes/Elements/Scraped_Images")
+PMSS_ARCHIVE = os.environ.get("PMSS_ARCHIVE", "/Volumes/Elements/PMSS_ARCHIVE")
+CONTENTDM_IMAGES = os.environ.get("PMSS_CONTENTDM_IMAGES", "/Users/bereacollege/Desktop/for CONTENTdm/Images")
+CSV_OUTPUT = os.environ.get("PMSS_CSV_OUTPUT", "/Users/bereacollege/Desktop/PMSS_Scraper/csv")
+RESULTS = os.path.abspath(os.environ.get("PMSS_RESULTS", "."))  # where the text reports are written
+FRONTIER = os.environ.get("PMSS_FRONTIER", os.path.join(RESULTS, "crawl_state.sqlite3"))  # the crawl, for --resume
+ARCHIVE_INDEX = os.environ.get("PMSS_ARCHIVE_INDEX", os.path.join(RESULTS, "archive_index.sqlite3"))
+DATASET = os.environ.get("PMSS_DATASET", os.path.join(RESULTS, "pmss_dataset.sqlite3"))  # the results as tables
+# what was copied into the CONTENTdm folder and the checksum of each file
+PACKAGE_MANIFEST = os.environ.get("PMSS_PACKAGE_MANIFEST", os.path.join(RESULTS, "package_manifest.sqlite3"))
+FIXITY = os.environ.get("PMSS_FIXITY", os.path.join(RESULTS, "fixity.sqlite3"))  # the hash of every archive tif
+# the perceptual hash of every scraped image and archive tif
+PERCEPTUAL_HASHES = os.environ.get("PMSS_PERCEPTUAL_HASHES", os.path.join(RESULTS, "perceptual_hashes.sqlite3"))
+PAGES = os.environ.get("PMSS_PAGES", os.path.join(RESULTS, "pages.jsonl"))  # every scraped page, one per line
+HTTP_CACHE = os.environ.get("PMSS_HTTP_CACHE", os.path.join(RESULTS, "http_cache"))  # pages kept for revalidation
+WARC = os.environ.get("PMSS_WARC", os.path.join(RESULTS, "pages.warc.gz"))  # every fetched page as it was served
+
+known_directories = set()  # directories that are known to exist so they are only checked once
+directories_lock = threading.Lock()
+
+
+def ensure_dir(directory):
+    """
+    Makes a directory and any missing parents, only touching the disk the first time a directory is asked for
+    :param directory: An absolute path to a directory
+    :return: The directory
+    """
+    if directory in known_directories:
+        return directory
+    os.makedirs(directory, exist_ok=True)  # safe even if another thread makes it at the same time
+    with directories_lock:
+        known_directories.add(directory)
+    return directory
+
+
+def scraped_image_path(upload_date, file_name):
+    """
+    Finds where a downloaded image is saved, making its upload date directories if they do not exist
+    :param upload_date: The image's upload date as "month/year"
+    :param file_name: The image's file name
+    :return: The absolute path of the image
+    """
+    directory = os.path.join(SCRAPED_IMAGES, *[part for part in upload_date.split("/") if part])
+    return os.path.join(ensure_dir(directory), file_name)
+
+
+def csv_path(file_name):
+    """
+    :param file_name: The name of a csv file
+    :return: The absolute path the csv file is written to
+    """
+    return os.path.join(ensure_dir(CSV_OUTPUT), file_name)
+
+
+def results_path(file_name):
+    """
+    :param file_name: The name of a report file
+    :return: The absolute path the report is written to
+    """
+    return os.path.join(ensure_dir(RESULTS), file_name)
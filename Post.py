@@ -1,4 +1,6 @@
 class Post:
+    __slots__ = ("id", "post_date", "post_title", "post_content", "post_excerpt", "meta_value")
+
     def __init__(self):
         self.id = 0
         self.post_date = ""
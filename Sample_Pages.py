@@ -0,0 +1,124 @@
+import random
+
+BASE = "https://pmss.wpengine.com/"
+WORDS = ["Pine", "Mountain", "Settlement", "School", "students", "weaving", "farm", "dairy", "Laurel", "House",
+         "Big", "Log", "garden", "1920s", "Harlan", "County", "Kentucky", "Zande", "Creech", "Glyn", "Morris",
+         "Angela", "Melville", "basketball", "chapel", "Christmas", "pageant", "nurses", "clinic", "mill"]
+# the row titles used in the site's bibliography tables
+BIB_TITLES = ["Title", "Alt. Title", "Identifier", "Creator", "Alt. Creator", "Subject Keyword", "Subject LCSH",
+              "Date digital", "Date original", "Date", "Publisher", "Contributor", "Type", "Format", "Source",
+              "Language", "Relation", "Coverage Temporal", "Coverage Spatial", "Rights", "Donor", "Description",
+              "Acquisition", "Citation", "Processed by", "Last updated", "Bibliography"]
+
+
+def words(generator, low, high):
+    return " ".join(generator.choice(WORDS) for _ in range(generator.randint(low, high)))
+
+
+def image_name(generator):
+    return "%s_%s_%03d" % (generator.choice(WORDS).lower(), generator.choice(WORDS).lower(), generator.randrange(40))
+
+
+def img(generator, name, described=None):
+    """
+    :return: An img tag like the ones WordPress writes, pointing at a resized copy in the uploads folder
+    """
+    year = generator.choice(["2016", "2017", "2019"])
+    month = "%02d" % generator.randint(1, 12)
+    width, height = generator.choice([(300, 200), (150, 150), (1024, 768)])
+    extra = ' aria-describedby="%s"' % described if described else ""
+    return '<img src="%swp-content/uploads/%s/%s/%s-%dx%d.jpg" width="%d" height="%d"%s/>' % (
+        BASE, year, month, name, width, height, width, height, extra)
+
+
+def gallery(generator):
+    """
+    :return: A gallery whose captions are dd tags linked to the images by aria-describedby
+    """
+    items = []
+    for _ in range(generator.randint(1, 6)):
+        caption_id = "gallery-%d-%d" % (generator.randrange(9), generator.randrange(100000))
+        items.append('<dl class="gallery-item"><dt class="gallery-icon">%s</dt>'
+                     '<dd class="wp-caption-text gallery-caption" id="%s">\n    %s\n    </dd></dl>'
+                     % (img(generator, image_name(generator), caption_id), caption_id, words(generator, 3, 12)))
+    return '<div class="gallery">%s</div>\n' % "".join(items)
+
+
+def figure(generator):
+    return '<figure class="wp-caption">%s<figcaption class="wp-caption-text">%s</figcaption></figure>\n' % (
+        img(generator, image_name(generator)), words(generator, 3, 10))
+
+
+def tags(generator):
+    return "<p>TAGS: %s</p>\n" % "; ".join(words(generator, 1, 3) for _ in range(generator.randint(1, 6)))
+
+
+def transcription(generator):
+    """
+    :return: A transcription section where each image's name in brackets is followed by its text
+    """
+    parts = ["<h2>Transcription</h2>\n"]
+    for _ in range(generator.randint(1, 3)):
+        parts.append("<p>[%s.jpg]</p>\n" % image_name(generator))
+        for _ in range(generator.randint(1, 3)):
+            parts.append("<p><span>%s</span> %s</p>\n" % (words(generator, 4, 20), words(generator, 2, 8)))
+    return "".join(parts)
+
+
+def bibliography(generator):
+    """
+    :return: A two column bibliography table; about one title in ten has a typo the fuzzy match has to catch
+    """
+    rows = []
+    for title in generator.sample(BIB_TITLES, generator.randint(3, len(BIB_TITLES))):
+        if generator.random() < .1 and len(title) > 4:
+            title = title[:-1] + "x"
+        rows.append("<tr>\n<td>%s</td>\n<td>%s</td>\n</tr>\n" % (title, words(generator, 1, 8)))
+    return '<table>\n<colgroup><col/><col/></colgroup>\n<tbody>\n%s</tbody>\n</table>\n' % "".join(rows)
+
+
+def links(generator, count, low, high):
+    return "".join('<li><a href="%s?page_id=%d">%s</a></li>' % (BASE, generator.randrange(count),
+                                                                words(generator, 1, 3))
+                   for _ in range(generator.randint(low, high)))
+
+
+def page(generator, number, count):
+    """
+    Makes the html of one page. About one page in ten is a GUIDE page that is mostly links; the rest mix galleries,
+    figures, tags, transcriptions and bibliographies like the site's collection pages.
+    :param generator: A random.Random
+    :param number: The page's id
+    :param count: How many pages the site has, so links point at real pages
+    :return: The page's html
+    """
+    if generator.random() < .1:
+        title = "GUIDE to " + words(generator, 2, 4)
+        body = ["<p>%s</p>\n" % words(generator, 10, 30), "<ul>%s</ul>\n" % links(generator, count, 10, 40)]
+    else:
+        title = words(generator, 2, 6)
+        body = []
+        for _ in range(generator.randint(1, 4)):
+            body.append(generator.choice([gallery, figure, figure, gallery])(generator))
+        if generator.random() < .6:
+            body.append(tags(generator))
+        if generator.random() < .4:
+            body.append(transcription(generator))
+        body.append("<p>%s</p>\n" % words(generator, 10, 60))
+        if generator.random() < .5:
+            body.append(bibliography(generator))
+    return ('<!DOCTYPE html>\n<html><head><title>PMSS</title></head><body>\n<article class="post-%d page">\n'
+            '<h1 class="entry-title">%s</h1>\n<div class="entry-content">\n%s</div>\n</article>\n'
+            '<nav><ul>%s</ul></nav>\n</body></html>\n'
+            % (number, title, "".join(body), links(generator, count, 2, 8)))
+
+
+def make_corpus(count=200, seed=7):
+    """
+    Makes a site of pages that look like the PMSS website's, the same every time for the same seed
+    :param count: How many pages to make
+    :param seed: Seed for the random content
+    :return: A dictionary with the url as the key and the html as the value
+    """
+    generator = random.Random(seed)
+    return {BASE + "?page_id=%d" % number: page(generator, number, count) for number in range(count)}
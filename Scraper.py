@@ -1,137 +1,49 @@
-from bs4 import BeautifulSoup
-from PMSS_Image import PMSS_Image
+import argparse
+from PMSS_Image import PMSS_Image, plain
 from Caption import Caption
-import copy
-import csv
+import sys
 import os.path
 from Page import Page
-import numpy as np
-import requests
 import os
 from os import path
 import time
 import bs4
 from Post import Post
-from io import open as iopen
-import string
-from shutil import copy as dm_copy
+from Parser import make_soup
+from Page_Visitor import PageVisitor
+from Page_Sink import PageSink, SavedPages
+from Master_List import MasterList
+from Csv_Export import CsvExport, clean_tags
+from Dataset_Export import DatasetExport
+from Packager import Packager, plan_copies
+from Fixity import Fixity, check_archive
+from Image_Manager import ContentMatcher
+import Similarity
+from Name_Matcher import NameMatcher
+from Archive_Index import ArchiveIndex, open_index
+import Paths
+from Transport import get_transport
+from Metrics import get_metrics
+from Image_Downloader import stream_to_file
+from Web_Archive import WarcArchive, WarcWriter
 
 
 def levenshtein_ratio_and_distance(s, t, ratio_calc=False):
-    # Code adapted from Francisco Javier Carrera Arias from
-    # https://www.datacamp.com/community/tutorials/fuzzy-string-python
-
     """
     Levenshtein_ratio_and_distance:
     Calculates levenshtein distance between two strings.
     If ratio_calc = True, the function computes the
-    Levenshtein distance ratio of similarity between two strings
-    For all i and j, distance[i,j] will contain the Levenshtein
-    distance between the first i characters of s and the
-    first j characters of t
-    """
-    # Initialize matrix of zeros
-    rows = len(s) + 1
-    cols = len(t) + 1
-    distance = np.zeros((rows, cols), dtype=int)
-    row = 0
-    col = 0
-
+    Levenshtein distance ratio of similarity between two strings,
+    where the cost of a substitution is 2 to align the results with those of the Python Levenshtein package.
+    The work is done by the Similarity module.
+    """
     if s == "" or t == "":
         return 0
-
-    # Populate matrix of zeros with the indices of each character of both strings
-    for i in range(1, rows):
-        for k in range(1, cols):
-            distance[i][0] = i
-            distance[0][k] = k
-
-    # Iterate over the matrix to compute the cost of deletions,insertions and/or substitutions
-    for col in range(1, cols):
-        for row in range(1, rows):
-            if s[row - 1] == t[col - 1]:
-                cost = 0
-                # If the characters are the same in the two strings in a given position [i,j]
-                # then the cost is 0
-            else:
-                # In order to align the results with those of the Python Levenshtein package,
-                # if we choose to calculate the ratio
-                # the cost of a substitution is 2. If we calculate just distance, then the cost of a substitution is 1.
-                if ratio_calc:
-                    cost = 2
-                else:
-                    cost = 1
-            distance[row][col] = min(distance[row - 1][col] + 1,  # Cost of deletions
-                                     distance[row][col - 1] + 1,  # Cost of insertions
-                                     distance[row - 1][col - 1] + cost)  # Cost of substitutions
     if ratio_calc:
-        # Computation of the Levenshtein Distance Ratio
-        ratio = ((len(s) + len(t)) - distance[row][col]) / (len(s) + len(t))
-        return ratio
+        return Similarity.ratio(s, t)
     else:
-        # Uncomment if you want to see the matrix showing how the algorithm computes the cost of deletions,
-        # print(distance)
-        # insertions and/or substitutions
         # This is the minimum number of edits needed to convert string a to string b
-        return "The strings are {} edits away".format(distance[row][col])
-
-
-def dir_dive():
-    """
-    A function to find all the names of .tif's and .jpg's
-    :return: A dictionary of names of files
-    """
-    os.chdir("/Volumes/Elements/PMSS_ARCHIVE")  # looks at this specific directory
-    tifs = {}  # dictionary to store all of the tif images
-    # finds all files within the directory and within all sub-directories
-    for root, dirs, files in os.walk(".", topdown=False):
-        for name in files:
-            original = name  # original file name that includes .tif
-            if name[-4:] == ".tif":  # if the extension is tif
-                for punct in string.punctuation:  # for every punctuation
-                    name = name.replace(punct, "")  # removes all instances of a specific punctuation
-                name = name.replace(" ", "")
-                # stores the file name with punctuation removed as the key in the dictionary
-                # with the original file name as the value
-                tifs[name] = original
-    return tifs  # returns the dictionary with all tifs
-
-
-def file_split_website(list_of_images):
-    """
-    A function that will remove punctuation from all of the file names of images that are on the website.
-    :param list_of_images: A list of images from website
-    :return: A dictionary of file names
-    """
-    file_list = {}  # dictionary to store all file names from the web site
-    for image in list_of_images:  # for each image in the list of images
-        name_to_fix = list_of_images[image].file_name  # store the original file name to be put in the dictionary
-        for punct in string.punctuation:  # for every punctuation
-            name_to_fix = name_to_fix.replace(punct, "")  # removes all instances of a specific punctuation
-            # stores the file name with punctuation removed as the key in the dictionary
-            # with the original file name as the value
-        file_list[name_to_fix] = image
-    return file_list  # returns the dictionary with all the files
-
-
-def compare_page_to_hdd(web_images, hdd_images):
-    """
-    A function that will compare the file names of the web site to the file names of the hard drive.
-    :param web_images: Images from the web site
-    :param hdd_images: Images from the hard drive
-    :return: Dictionary of all images that have matched with each other
-    """
-    match_count = 0
-    matched_items = {}  # Dictionary of all images that have matched with each other
-    for image in web_images:  # for each image in the dictionary of web images
-        for source in hdd_images:  # for each image in the hard drive
-            if image[:-3] == source[:-3]:  # removes extensions like tif or jpg and then compares the two file names
-                if source[-3:] == "tif":  # if the extension is tif
-                    # store the file name from web site as the key and the hard drive file name as the value
-                    matched_items[image] = source
-                    match_count += 1
-    print(f"{match_count} pictures were replaced with their \"tif\" counterpart")
-    return matched_items  # return dict with matched file names
+        return "The strings are {} edits away".format(Similarity.distance(s, t))
 
 
 def extract_csv_information(filename):
@@ -165,13 +77,12 @@ def extract_csv_information(filename):
     return csv_info_list
 
 
-def web(links_visited, web_url, pages_list):
+def is_crawlable(web_url, links_visited):
     """
-    Web Crawler that will scan through the pmss webpage and find all different links from various pages
-    :param links_visited: List that will store all of the links visited through the crawler
-    :param web_url: The Urls that will be visited
-    :param pages_list: A list that will hold all the information for every page
-    :return: None
+    Decides whether the crawler should visit a link
+    :param web_url: The Url that might be visited
+    :param links_visited: Collection of all of the links that have been visited already
+    :return: True if the link is inside the pmss domain and has not been visited yet
     """
     urls_to_skip = ["https://pmss.wpengine.com/?page_id=19612",
                     "https://pmss.wpengine.com/?page_id=48056", "https://pmss.wpengine.com/?attachment_id=3868",
@@ -180,80 +91,122 @@ def web(links_visited, web_url, pages_list):
     if len(split_link) > 1:  # base case to ensure that there is a link
         domain = split_link[0] + split_link[1]  # stores the domain
     else:
-        return
+        return False
     ext = ["jpg", "png", "tif", "ppt", "pptx"]  # extensions of images
     if domain != "https://pmsswpengine":  # base case we always need this url for our domain
-        return  # it will only scrape data within the domain of pmss
+        return False  # it will only scrape data within the domain of pmss
     # base case if we have already visited the link we do not want to re-visit it over
     if web_url in links_visited or web_url in urls_to_skip:
-        return
-    # TODO: If you want to change the number of pages to crawl through, change the number below
-    # if len(links_visited) > 500:  # restriction for the amount of pages we want to search (temporary)
-    #     return
+        return False
     if web_url.split(".")[-1] in ext:  # split url if the end of url is in ext just return
-        return
-    links_visited.append(web_url)  # append the urls that we visit to a list of links visited
-    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36\
-      (KHTML, like Gecko) Chrome/74.0.3729.169 Safari/537.36'}  # the User-Agent header mimics a browser
+        return False
+    return True
+
+
+def links_only_filter(prefixes):
+    """
+    Makes the check the crawler uses to find pages whose content is not needed, like archive and category listings
+    that only repeat posts found elsewhere
+    :param prefixes: A list of url prefixes, or None
+    :return: A function that is True for a url that starts with one of the prefixes, or None if there are none
+    """
+    if not prefixes:
+        return None
+    prefixes = tuple(prefixes)
+    return lambda web_url: web_url.startswith(prefixes)
 
-    result = requests.get(web_url, headers=headers)
-    plain = result.text  # raw html
 
-    pages_list.append(pages_info(plain, web_url))  # append the page to a list after getting info for it
-    page_soup = BeautifulSoup(plain, "html.parser")  # beautiful soup object; parses the html
+def page_links(page_soup):
+    """
+    Finds the destinations of all of the links on a page that the crawler should follow
+    :param page_soup: Beautiful Soup object
+    :return: A list of link destinations in the order they appear on the page
+    """
+    destinations = []  # list of all the links that will be followed
     for link in page_soup.findAll('a'):  # finds all a tags within html
         if not link.get("class"):  # avoid the html tag with class
-            # if len(links_visited) > 500:
-            #     return
             if link.contents:  # checks to make sure there are contents before we get the name
                 if link.contents[0].name != "img":  # if the link is not for an image
                     if link.parent:  # if the link has a parent tag
                         try:
                             if link.parent.get("class")[0] == "must-log-in":  # if the link goes to a log in page
-                                return  # ignore this link
+                                return destinations  # ignore this link and the rest of the page
                         except TypeError:  # if a TypeError occurs
                             pass  # keep code going
                     links_destination = link.get('href')  # gets the href and this determines the links destination
                     if not links_destination:
-                        return
+                        return destinations
                     try:
                         if links_destination.split("/")[3] == "wp-admin":
-                            return
+                            return destinations
                     except IndexError:
                         pass
-                    if links_destination:
-                        web(links_visited, links_destination,
-                            pages_list)  # recursive call to keep calling the different links
+                    destinations.append(links_destination)
+    return destinations
 
 
-def pages_info(text, url):
+def web(links_visited, web_url, pages_list):
+    """
+    Web Crawler that will scan through the pmss webpage and find all different links from various pages
+    :param links_visited: List that will store all of the links visited through the crawler
+    :param web_url: The Urls that will be visited
+    :param pages_list: A list that will hold all the information for every page
+    :return: None
+    """
+    if not is_crawlable(web_url, links_visited):
+        return
+    # TODO: If you want to change the number of pages to crawl through, change the number below
+    # if len(links_visited) > 500:  # restriction for the amount of pages we want to search (temporary)
+    #     return
+    links_visited.append(web_url)  # append the urls that we visit to a list of links visited
+
+    result = get_transport().get(web_url, endpoint="pages")
+    plain = result.text  # raw html
+
+    page_soup = PageVisitor(make_soup(plain))  # parses the html and walks the tree once for the content and the links
+    pages_list.append(pages_info(plain, web_url, page_soup=page_soup))  # append the page after getting info for it
+    for links_destination in page_links(page_soup):
+        web(links_visited, links_destination, pages_list)  # recursive call to keep calling the different links
+
+
+def pages_info(text, url, downloader=None, page_soup=None):
     """
     Driver function for getting information for a page.
     :param text: full html as plain text
     :param url: The url for the web page
+    :param downloader: Optional ImageDownloader that saves the page's images in the background
+    :param page_soup: The page's Beautiful Soup object or PageVisitor if it has already been parsed
     :return: page object
     """
     current_page = Page()  # creates a new page object
-    web_page = BeautifulSoup(text, 'html.parser')  # Create a new Beautiful Soup object
-    current_page.images = image_info(web_page)
-    captions = find_captions(web_page)
-    image_caption_linking(captions, current_page.images)
-    current_page.bibliography, partial_bib = bibliography_pairings(web_page)  # check for bibliographies on the page
+    web_page = page_soup if page_soup is not None else make_soup(text)  # Create a new Beautiful Soup object
+    if not isinstance(web_page, PageVisitor):
+        web_page = PageVisitor(web_page)  # walk the tree once and share the tags with every extractor
+    metrics = get_metrics()
+    with metrics.stage("images"):
+        current_page.images = image_info(web_page, downloader)
+    with metrics.stage("caption linking"):
+        captions = find_captions(web_page)
+        image_caption_linking(captions, current_page.images)
+    with metrics.stage("bibliography"):
+        current_page.bibliography, partial_bib = bibliography_pairings(web_page)  # check for bibliographies on the page
     current_page.url = url  # save the current url with in the page's attributes
     # check_if_guide(web_page, current_page)
-    find_transcriptions(web_page, current_page.images)
+    with metrics.stage("transcription"):
+        find_transcriptions(web_page, current_page.images)
     show_results(current_page)
     return current_page
 
 
-def image_info(page_soup):
+def image_info(page_soup, downloader=None):
     """
     Finds all images on the page and collects as much information as it can
     :param page_soup: A Beautiful Soup object
+    :param downloader: Optional ImageDownloader that saves the images in the background
     :return: A dictionary containing all of the images from the page
     """
     images_dict = {}  # create a dictionary for the images
-    page_tags = image_tags(page_soup)  # gets the tags for the page
+    page_tags = sys.intern(image_tags(page_soup))  # gets the tags for the page; pages with the same tags share them
     for image in page_soup.find_all('img'):  # for an image it will find all of the img tags within the html of the page
         if image.get("src"):  # if our image has a src attribute
             temp = PMSS_Image()  # initialize a new image instance
@@ -272,55 +225,43 @@ def image_info(page_soup):
             temp.strip_resolution()
 
             # Set the tags for the images as the same tags from the page
-            temp.tags = page_tags
+            temp.tags = page_tags  # one string shared by every image on the page
 
             # Attempts to save the image
-            download_image(temp, src)
+            download_image(temp, src, downloader)
 
             if image.parent.name == "figure":  # If we are looking at an image from a figure tag
                 for tag in image.parent.children:  # for each of the tag's siblings
                     if tag.name == "figcaption":  # if a sibling's tag namme is figcaption
-                        temp.caption = tag.string  # save the text as it is the caption for our image
+                        temp.caption = plain(tag.string)  # save the text as it is the caption for our image
             file_names_skip = ["220px-Norman_Thomas_1937.jpg", "12px-Wikisource-logo.svg.png", "Emma_Lucy_Braun.jpg",
                                # ignore these files because they're irrelevant to scraping
                                "04025r.jpg", "apf1-00354r.jpg", "cropped-pmss_spelman_pntg_edited_2_brightened_x.jpg"]
             if temp.file_name not in file_names_skip and ".gif" not in temp.file_name:  # Ignore the header image
                 # Copy the image to a dictionary
-                images_dict[temp.file_name[:-len(temp.file_name.split(".")[-1]) - 1].lower()] = copy.copy(temp)
+                images_dict[temp.file_name[:-len(temp.file_name.split(".")[-1]) - 1].lower()] = temp
     return images_dict
 
 
-def download_image(image, src):
+def download_image(image, src, downloader=None):
     """
     A function that downloads the images that have not been saved from the web site.
     :param image: Instance of the PMSS_Image class
     :param src: The URL from the image that we want to save
+    :param downloader: Optional ImageDownloader; if given the image is queued instead of downloaded right away
     :return: None
     """
-    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36\
-          (KHTML, like Gecko) Chrome/74.0.3729.169 Safari/537.36'}
-    hdd_image_path = "/Volumes/Elements/Scraped_Images/"
-    os.chdir(hdd_image_path)  # changes directory to the location that we want to save images
-    upload_date = image.upload_date.split("/")  # gets the upload date to be used in setting the save directory
-
-    for partial_date in upload_date:  # for each part fo the date in the upload date
-        try:  # try to go into the csv directory
-            os.chdir(partial_date)  # change directory to the partial date
-        except FileNotFoundError:  # if the directory does not exist
-            os.mkdir(partial_date)  # make directory for the partial date
-            os.chdir(partial_date)  # change directory to the newly made directory
-
-    # file path is the path to the file that we are potentially going to save
-    file_path = os.getcwd() + "/" + image.file_name
+    # file path is the path to the file that we are potentially going to save; the upload date sets the directory
+    file_path = Paths.scraped_image_path(image.upload_date, image.file_name)
     if not path.exists(file_path):  # if the file name already exists
         if "C:/" not in src and ".gif" not in src:  # if the image URL we want to save is not a hard drive path
             img_resolution = "-" + str(image.image_resized_resolution[0]) + "x" + str(image.image_resized_resolution[1])
             if img_resolution in src:
                 src = src.replace(img_resolution, "")
-            response = requests.get(src, headers=headers)  # gets the image itself; raw image data
-            if response.status_code != 404:  # if the image exists
-                with iopen(file_path, "wb") as image_file:  # retrieves image from file path
-                    image_file.write(response.content)  # writes the image data in to the file
+            if downloader is not None:
+                downloader.submit(src, file_path)  # a worker thread will save the image
+            else:
+                stream_to_file(src, file_path, get_transport())  # saves the image a chunk at a time
 
 
 def caption_link(tag, img):
@@ -350,7 +291,7 @@ def image_file_path_info(tag, img):
     img.file_name = file_split[-1]  # retrieves the file name once the file has been split
     year = file_split[-3]  # retrieves the year the image was uploaded from the file name
     month = file_split[-2]  # retrieves the month the image was uploaded from the file name
-    img.upload_date = month + "/" + year  # uploads the date of the image based on month and year
+    img.upload_date = sys.intern(month + "/" + year)  # uploads the date of the image based on month and year
 
 
 def image_resolution(tag, img):
@@ -376,14 +317,12 @@ def find_captions(page_soup):
         temp = Caption()  # temporarily stores a caption for class constructor
         temp.image_link = caption.get('id')  # retrieves the caption through the tag of "id" which will be image link
         temp.caption = caption.string[5:-5]  # save the caption ignoring all the \n's near it
-        captions_dict[temp.image_link] = copy.copy(
-            temp)  # makes a shallow copy of the image link stored in the dictionary
+        captions_dict[temp.image_link] = temp  # a new Caption is made for every tag so it does not need copying
     for caption in page_soup.find_all('p'):  # for every caption find the "p" tags
         temp = Caption()  # temporarily stores a caption for class constructor
         temp.image_link = caption.get('id')  # retrieves the caption through the tag of "id" which will be image link
-        temp.caption = caption.string  # converts caption to a string
-        captions_dict[temp.image_link] = copy.copy(
-            temp)  # makes a shallow copy of the image link stored in the dictionary
+        temp.caption = plain(caption.string)  # converts caption to a string
+        captions_dict[temp.image_link] = temp
 
     return captions_dict  # return the dictionary
 
@@ -395,14 +334,13 @@ def image_caption_linking(captions_dict, images_dict):
     :param images_dict: Dictionary holding all images from the page
     :return: None
     """
-    for caption in captions_dict.keys():  # for every caption of an image in the caption dictionary
-        for image in images_dict.keys():  # for every image in the image dictionary
-            if images_dict[image].caption_link:  # If a caption link id was found
-                if not images_dict[image].caption:  # if a caption has not been found yet
-                    # if the caption dictionary matches the image dictionary
-                    if captions_dict[caption].image_link == images_dict[image].caption_link:
-                        images_dict[image].caption = captions_dict[
-                            caption].caption  # then the image will go with the caption
+    for image in images_dict.keys():  # for every image in the image dictionary
+        if images_dict[image].caption_link:  # If a caption link id was found
+            if not images_dict[image].caption:  # if a caption has not been found yet
+                # the caption dictionary uses the caption's id as the key, so the image's link finds it directly
+                caption = captions_dict.get(images_dict[image].caption_link)
+                if caption is not None and caption.image_link == images_dict[image].caption_link:
+                    images_dict[image].caption = caption.caption  # then the image will go with the caption
 
 
 def image_tags(page_soup):
@@ -417,30 +355,14 @@ def image_tags(page_soup):
         if tag.string:  # if the tag has a string
             if "TAGS:" in tag.string:  # if "TAGS" is in that string
                 tag_body = tag.string.split("TAGS:")  # removes "TAGS" from the string
-                for descr_tag in tag_body[1].split(";"):  # for each descriptive tag
-                    if descr_tag:  # if the descriptive tag is not blank
-                        cleaned_tag = descr_tag.replace(u'\xa0', u' ')  # replace "NBSP" with an actual space
-                        if len(cleaned_tag) > 2:  # if the tag is bigger than 2 characters
-                            while cleaned_tag[0] == " ":  # while the first element is not an actual character
-                                cleaned_tag = cleaned_tag[1:]  # save contents except the first element
-                            while cleaned_tag[-1] == " ":  # while the last element is not an actual character
-                                cleaned_tag = cleaned_tag[:-1]  # save contents except the last element
-                            tags += cleaned_tag + ", "  # concatenate the tag to a string
+                tags += clean_tags(tag_body[1])  # concatenate the cleaned tags to a string
         else:
             for child in tag.children:  # if the tag does not have a string look at the child of the tag
                 if child.string:  # if the child has a string
 
                     if "TAGS:" in child.string:  # if "TAGS" is in that child string
                         tag_body = child.next_sibling.string  # looks at the siblings of that string
-                        for descr_tag in tag_body.split(";"):  # for each descriptive tag
-                            if descr_tag:  # if the descriptive tag is not blank
-                                cleaned_tag = descr_tag.replace(u'\xa0', u' ')  # replace "NBSP" with an actual space
-                                if len(cleaned_tag) > 2:  # if the tag is bigger than 2 characters
-                                    while cleaned_tag[0] == " ":  # while the first element is not an actual character
-                                        cleaned_tag = cleaned_tag[1:]  # save contents except the first element
-                                    while cleaned_tag[-1] == " ":  # while the first element is not an actual character
-                                        cleaned_tag = cleaned_tag[:-1]  # save contents except the last element
-                                    tags += cleaned_tag + ", "  # concatenate the tag to a string
+                        tags += clean_tags(tag_body)  # concatenate the cleaned tags to a string
     return tags  # return the string that contains all the tags
 
 
@@ -567,8 +489,7 @@ def find_transcriptions(page_soup, img_dict):
                                     # assume they are the same
                                     print(subsection.lower())
                                     print(keys[image_index])
-                                    if levenshtein_ratio_and_distance(subsection.lower(), keys[image_index],
-                                                                      True) >= .80:
+                                    if Similarity.ratio(subsection.lower(), keys[image_index], .80) >= .80:
                                         current_file = keys[image_index]  # update the current file
                                         image_index += 1  # increase the image index
                                         # since we determined it is a file name, this is now False
@@ -687,18 +608,15 @@ def bibliography_pairings(page_soup):
                         for i in range(len(row_title_list)):  # for each item
                             # if the current item is not in the reference list
                             if row_title_list[i].lower() not in table_row_titles_lower:
-                                is_part_of_dict = False  # assume it is not a part of the bibliography
-                                for title in table_row_titles_lower:  # for each item in the reference list
-                                    # if the reference item and the row title are similar but not an exact match
-                                    if levenshtein_ratio_and_distance(title, row_title_list[i].lower(), True) >= .80:
-                                        is_part_of_dict = True  # title is a part of the bibliography
-                                        item_index = table_row_titles_lower.index(title)  # index of the reference item
-                                        # add the item to the bibliography using the storing list and index
-                                        # this is so the title that is stored is formatted correctly
-                                        bibliography_dict[table_row_titles[item_index]] = row_info_list[i]
-                                        count_key += 1  # increment how many keys have been saved
-                                        break
-                                if not is_part_of_dict:  # if no reference items match
+                                # the first reference item that is similar to the row title but not an exact match
+                                item_index = Similarity.first_match(row_title_list[i].lower(), table_row_titles_lower,
+                                                                    .80)
+                                if item_index is not None:  # title is a part of the bibliography
+                                    # add the item to the bibliography using the storing list and index
+                                    # this is so the title that is stored is formatted correctly
+                                    bibliography_dict[table_row_titles[item_index]] = row_info_list[i]
+                                    count_key += 1  # increment how many keys have been saved
+                                else:  # if no reference items match
                                     bibliography_dict = {}  # clear the dictionary
                                     return bibliography_dict, True  # return empty dictionary
                             else:  # if the current item is in the reference list
@@ -715,18 +633,14 @@ def bibliography_pairings(page_soup):
                             full_info += info  # add the info to the full string
                         # if the title is not in the reference list
                         if full_title.lower() not in table_row_titles_lower:
-                            is_part_of_dict = False  # assume it is not part of the bibliography
-                            for title in table_row_titles_lower:
-                                # if the reference item and the row title are similar but not an exact match
-                                if levenshtein_ratio_and_distance(title, full_title, True) >= .80:
-                                    is_part_of_dict = True  # title is a part of the bibliography
-                                    item_index = table_row_titles_lower.index(title)  # index of the reference item
-                                    # add the item to the bibliography using the storing list and index
-                                    # this is so the title that is stored is formatted correctly
-                                    bibliography_dict[table_row_titles[item_index]] = full_info
-                                    count_key += 1  # increment how many keys have been saved
-                                    break
-                            if not is_part_of_dict:  # if no reference items match
+                            # the first reference item that is similar to the title but not an exact match
+                            item_index = Similarity.first_match(full_title, table_row_titles_lower, .80)
+                            if item_index is not None:  # title is a part of the bibliography
+                                # add the item to the bibliography using the storing list and index
+                                # this is so the title that is stored is formatted correctly
+                                bibliography_dict[table_row_titles[item_index]] = full_info
+                                count_key += 1  # increment how many keys have been saved
+                            else:  # if no reference items match
                                 bibliography_dict = {}  # clear the dictionary
                                 return bibliography_dict, True  # return empty dictionary
                         else:  # if the title is in the reference list
@@ -794,139 +708,27 @@ def create_master_list(pages_list):
     :param pages_list: List of pages
     :return: Complete list of all the bibliographies, all of the images, and list of guide pages
     """
-    list_of_images = {}  # Dictionary that will contain all the images
-    list_of_bibs = []  # List that will contain all the bibliographies
-    guide_pages = []  # List that will contain all the URLs for the guide pages
-    transcript_counter = 0
-    caption_counter = 0
-    duplicate_counter = 0
-    alt_captions_counter = 0
-    no_caption_counter = 0
-
+    master_list = MasterList()
     for page in pages_list:  # for each page in the list of pages
-        for image in page.images.keys():  # for each image in the pages dictionary of images
-            try:
-                if list_of_images[image]:  # if image key is already in the list of images
-                    if page.images[image].caption:
-                        if list_of_images[image].caption:
-                            if list_of_images[image].caption == page.images[image].caption:
-                                duplicate_counter += 1
-                            else:
-                                if levenshtein_ratio_and_distance(page.images[image].caption,
-                                                                  list_of_images[image].caption, True) > .80:
-                                    duplicate_counter += 1
-                                else:
-                                    list_of_images[image].alt_captions.append(
-                                        page.images[image].caption)  # add current caption to alt captions
-                                    alt_captions_counter += 1
-                        else:
-                            list_of_images[image].caption = page.images[image].caption
-                        list_of_images[image].url_sources += page.url + " "
-
-            except KeyError:
-                list_of_images[image] = page.images[image]  # if image is not in the dictionary add it to it
-                list_of_images[image].url_sources += page.url + " "
-
-            if list_of_images[image].transcription:
-                transcript_counter += 1
-            if page.images[image].caption:
-                caption_counter += 1
-        if page.bibliography:  # if there is a bibliography for the page
-            list_of_bibs.append(page.bibliography)  # append bibliography to the list of bibliographies
-        if page.is_guide:  # if this is a GUIDE page
-            guide_pages.append(page.url)  # append the URL to the list of GUIDE URLs
-
-    for image in list_of_images.keys():
-        if not list_of_images[image].caption:
-            no_caption_counter += 1
-    return list_of_bibs, list_of_images, guide_pages, transcript_counter, \
-        caption_counter, duplicate_counter, alt_captions_counter, no_caption_counter  # return all 3 structures
+        master_list.add_page(page)
+    return master_list.results()  # return all 3 structures and the counters
 
 
-def write_csv(images: dict, bibliographies: list):
+def write_csv(images: dict, bibliographies: list, index=None):
     """
     Uses the csv library to write .csv files containing the image's information
     :param images: The master list of all images that were scraped
     :param bibliographies: The master list of all bibliographies that were scraped
+    :param index: Optional ArchiveIndex to look the packaged images up in instead of walking the drive
     :return: None
     """
-    contentdm_columns = ["Title", "Alt. Title", "Identifier", "Creator", "Subject Keywords", "Subject", "Date",
-                         "Date Digitized", "Date Uploaded", "Date Accepted", "Publisher", "Contributors", "Type",
-                         "Format", "Source", "Language", "Relation", "Coverage Spatial", "Coverage Temporal",
-                         "Rights", "Audience", "Description", "Transcript", "Originating Institution", "Filename"]
-    identifier = 0
-    saved_file_names = []
-    # using the os module, the current directory plus /csv/ is where they will be stored
-    csv_path = "/Users/bereacollege/Desktop/PMSS_Scraper/csv/"
-    try:  # try to go into the csv directory
-        os.chdir(csv_path)
-    except FileNotFoundError:  # if the csv directory doesnt exist
-        os.mkdir(csv_path)  # make the csv directory
-        os.chdir(csv_path)  # change to the csv directory
-    for root, dirs, files in os.walk("/Users/bereacollege/Desktop/for CONTENTdm/Images/", topdown=False):
-        for name in files:
-            saved_file_names.append(name[:-4])
-    to_remove = []
-    for image in images:
-        if image not in saved_file_names:
-            to_remove.append(image)
-    print(f"{len(to_remove)} items have been removed.")
-    final_master_list = {}
-    for image in images:
-        if image not in to_remove:
-            final_master_list[image] = images[image]
-    images = final_master_list
-    with open("Images_for_contentdm.csv", 'w') as csvfile:  # open csv file for the page we are currently on
-        file_writer = csv.writer(csvfile)  # store the writer for the csv file to a variable
-        csv_data = [contentdm_columns]  # the first row are the column headings
-        for image in images.keys():  # for each image in our images dictionary
-            csv_data.append([images[image].file_name, "", identifier, "Unknown", images[image].tags, "", "",
-                             images[image].upload_date, images[image].upload_date, "Image", "",
-                             "Helen Hayes Wykle & Ann Angel Eberhardt", "",
-                             "", "", "", "", "", "",
-                             "All rights reserved, Pine Mountain Settlement School", "", images[image].caption, images[image].transcription,
-                             "Pine Mountain Settlement School", images[image].file_name])  # append the file name, transcription, and upload date
-            identifier += 1
-        file_writer.writerows(csv_data)  # write the information to the file
-        csvfile.close()  # close the file
-
-    with open("Bibliographies_for_contentdm.csv", 'w') as csvfile:  # open csv file for the page we are currently on
-        bib_file_writer = csv.writer(csvfile)  # store the writer for the csv file to a variable
-        csv_data = [contentdm_columns]
-        headers = ["Title", "Alt. Title", "Identifier", "Alt. Creator",
-                   "Subject Keyword", "Subject LCSH", "Date", "Date digital", "", "Acquisition",
-                   "Publisher", "Contributor", "Type", "Format", "Source", "Language", "Relation",
-                   "Coverage Spatial", "Coverage Temporal", "Rights", "", "Description",
-                   "Creator"]  # the first row are the column headings
-        for bib in bibliographies:  # for each image in our images dictionary
-            try:
-                tags = bib["Subject Keyword"]
-                tags = tags.split(";")
-                current_bib = []
-                final_tags = ""
-                for tag in tags:
-                    if tag:  # if the descriptive tag is not blank
-                        cleaned_tag = tag.replace(u'\xa0', u' ')  # replace "NBSP" with an actual space
-                        if len(cleaned_tag) > 2:  # if the tag is bigger than 2 characters
-                            while cleaned_tag[0] == " ":  # while the first element is not an actual character
-                                cleaned_tag = cleaned_tag[1:]  # save contents except the first element
-                            while cleaned_tag[-1] == " ":  # while the last element is not an actual character
-                                cleaned_tag = cleaned_tag[:-1]  # save contents except the last element
-                            final_tags += cleaned_tag + ", "  # concatenate the tag to a string
-                bib["Subject Keyword"] = final_tags
-            except KeyError:
-                pass
-            bib["Identifier"] = identifier
-            current_keys = bib.keys()
-            for header in headers:
-                if header in current_keys:
-                    current_bib.append(bib[header])
-                else:
-                    current_bib.append("")
-            csv_data.append(current_bib)  # append the file name, transcription, and upload date
-            identifier += 1
-        bib_file_writer.writerows(csv_data)  # write the information to the file
-        csvfile.close()  # close the file
+    if index is None:
+        index = ArchiveIndex()
+    index.refresh(Paths.CONTENTDM_IMAGES)  # only the directories that packaging changed are listed again
+    export = CsvExport(name[:-4] for root, name in index.files(Paths.CONTENTDM_IMAGES))
+    removed = export.write_images(Paths.csv_path("Images_for_contentdm.csv"), images)
+    print(f"{removed} items have been removed.")
+    export.write_bibliographies(Paths.csv_path("Bibliographies_for_contentdm.csv"), bibliographies)
 
 
 def compare_scraped_and_phpmyadmin_images(list_of_posts: list, image_dictionary: dict):
@@ -981,50 +783,45 @@ def write_result_files(bibliographies: list, images: dict, guide_pages: list):
     :param guide_pages: A list of all the guided web pages
     :return: None
     """
-    with open("Bibliographies_list", "w") as bib_file:  # opens the bibliography file
-        info_to_write = f"{len(bibliographies)} bibliographies\n\n"  # writes the number of bibliographies
+    # each piece is written as soon as it is made instead of adding it to one string for the whole file
+    with open(Paths.results_path("Bibliographies_list"), "w") as bib_file:  # opens the bibliography file
+        bib_file.write(f"{len(bibliographies)} bibliographies\n\n")  # writes the number of bibliographies
         for bib in bibliographies:  # for each bibliography in the list of bibliographies
             for attr in bib.keys():  # for each column in each bibliography
-                info_to_write += f"{attr}: {bib[attr]}\n"  # write the column name and what is stored there
-            info_to_write += "\n\n"
-        bib_file.write(info_to_write)  # writes all bibliography info into the file
-    with open("images_list", "w") as img_file:  # opens the image file
-        info_to_write = f"{len(images)} images\n\n"  # writes the number of images
+                bib_file.write(f"{attr}: {bib[attr]}\n")  # write the column name and what is stored there
+            bib_file.write("\n\n")
+    with open(Paths.results_path("images_list"), "w") as img_file:  # opens the image file
+        img_file.write(f"{len(images)} images\n\n")  # writes the number of images
         for img in images.keys():  # for each image in the list of images
-            # add the image information
-            info_to_write += f"File name: {images[img].file_name}\n" \
-                f"Caption: {images[img].caption}\n" \
-                f"Resized resolution: {images[img].image_resized_resolution[0]}x" \
-                f"{images[img].image_resized_resolution[1]}\n" \
-                f"Transcription: {images[img].transcription}\n" \
-                f"Upload date: {images[img].upload_date}\n\n\n"
-        img_file.write(info_to_write)  # writes all image info into the file
-
-    with open("guide_urls", "w") as guide_file:  # opens the file in write mode
-        info_to_write = f"{len(guide_pages)} guide pages\n\n"  # add the number of guide pages there are
+            # write the image information
+            img_file.write(f"File name: {images[img].file_name}\n"
+                           f"Caption: {images[img].caption}\n"
+                           f"Resized resolution: {images[img].image_resized_resolution[0]}x"
+                           f"{images[img].image_resized_resolution[1]}\n"
+                           f"Transcription: {images[img].transcription}\n"
+                           f"Upload date: {images[img].upload_date}\n\n\n")
+
+    with open(Paths.results_path("guide_urls"), "w") as guide_file:  # opens the file in write mode
+        guide_file.write(f"{len(guide_pages)} guide pages\n\n")  # add the number of guide pages there are
         for url in guide_pages:  # for each url in the url list
-            info_to_write += f"{url}\n"  # puts URL in the file
-        guide_file.write(info_to_write)  # write all the information into the file
-
-
-def package_contents(images):
-    scraped_path = "/Volumes/Elements/Scraped_Images/"
-    source_path = "/Volumes/Elements/PMSS_ARCHIVE"
-    for root, dirs, files in os.walk(scraped_path, topdown=False):
-        for name in files:
-            if name[:-4] in images:
-                if images[name[:-4]].file_name[-3:] != "tif":
-                    if not path.exists("/Users/bereacollege/Desktop/for CONTENTdm/Images/" + name):
-                        dm_copy(root + "/" + name, "/Users/bereacollege/Desktop/for CONTENTdm/Images/")
-    all_filenames = {}
-    for root, dirs, files in os.walk(source_path, topdown=False):
-        for name in files:
-            all_filenames[name] = root
-    for image in images:
-        if images[image].file_name in all_filenames.keys():
-            if images[image].file_name[-3:] == "tif":
-                if not path.exists("/Users/bereacollege/Desktop/for CONTENTdm/Images/" + images[image].file_name):
-                    dm_copy(all_filenames[images[image].file_name] + "/" + images[image].file_name, "/Users/bereacollege/Desktop/for CONTENTdm/Images/")
+            guide_file.write(f"{url}\n")  # puts URL in the file
+
+
+def package_contents(images, index=None):
+    """
+    Copies the scraped images and the matching archive tifs into the CONTENTdm folder
+    :param images: Dictionary that stores all of the images
+    :param index: Optional ArchiveIndex to look the files up in instead of walking the drive
+    :return: None
+    """
+    if index is None:
+        index = open_index(Paths.SCRAPED_IMAGES, Paths.PMSS_ARCHIVE)
+    plan = plan_copies(images, index)  # every copy is decided before the first one starts
+    fixity = Fixity()  # tifs hashed by --fixity are not read again just to be hashed
+    packager = Packager(Paths.CONTENTDM_IMAGES, fixity=fixity)
+    packager.package(plan)
+    packager.close()
+    fixity.close()
 
 
 def run_time():
@@ -1039,36 +836,207 @@ def run_time():
     print(f"~~----{mins}m {secs}s run time----~~")
 
 
-def main():
-    pages_list = []
+def write_run_report(prometheus_path=None):
+    """
+    Writes where the run spent its time to run_report.json in the results directory
+    :param prometheus_path: Optional file to also write the measurements to in the Prometheus text format
+    :return: None
+    """
+    metrics = get_metrics()
+    metrics.write_json(Paths.results_path("run_report.json"))
+    if prometheus_path:
+        metrics.write_prometheus(prometheus_path)
+
+
+def main(resume=False, parse_workers=0, parquet_dir=None, match_content=False, prometheus_path=None,
+         links_only=None):
+    """
+    Runs the whole scrape
+    :param resume: If True, continue an interrupted crawl instead of starting a new one
+    :param parse_workers: How many processes parse the pages while the crawler keeps fetching; 0 parses them in
+    this process
+    :param parquet_dir: Optional directory to also write the results to as Parquet files
+    :param match_content: If True, images that do not match a tif by name are matched by what they look like
+    :param prometheus_path: Optional file to also write the run's measurements to in the Prometheus text format
+    :param links_only: Optional list of url prefixes; pages under them are only searched for links, not scraped
+    :return: None
+    """
+    from Crawler import Crawler  # imported here since Crawler uses the functions in this module
+    from Frontier import Frontier
+    from Http_Cache import HttpCache
+    from Image_Downloader import ImageDownloader
+    from Image_Store import ImageStore
+    links_visited = []  # list of links visited
+    frontier = Frontier()
+    store = ImageStore(os.path.join(Paths.SCRAPED_IMAGES, ".store"))  # every image is saved once under its hash
+    transport = get_transport()
+    transport.archive = WarcWriter(Paths.WARC, resume)  # every page is kept so it can be scraped again offline
+    # every page is written to disk as soon as it is scraped instead of being kept in memory
+    with PageSink(Paths.PAGES, resume) as pages_list:
+        with get_metrics().stage("crawl"), ImageDownloader(store=store) as downloader:
+            # images keep downloading while pages are parsed
+            Crawler(frontier=frontier, cache=HttpCache(), downloader=downloader, parse_workers=parse_workers,
+                    links_only=links_only_filter(links_only)).crawl(
+                links_visited, 'https://pmss.wpengine.com/', pages_list, resume)
+        store.close()
+        frontier.close()
+        transport.archive.close()
+        transport.archive = None
+        make_results(pages_list, parquet_dir, match_content)
+    get_transport().print_stats()
+    run_time()
+    write_run_report(prometheus_path)
+
+
+def replay_archive(warc_path, parse_workers=0, parquet_dir=None, match_content=False, prometheus_path=None,
+                   links_only=None):
+    """
+    Scrapes the pages saved in a WARC file by an earlier crawl instead of the website. The archive is crawled the
+    same way as the site, but no requests are sent and no images are downloaded, so the run only takes as long as
+    the parsing.
+    :param warc_path: A .warc.gz file written during an earlier crawl
+    :param parse_workers: How many processes parse the pages; 0 parses them in this process
+    :param parquet_dir: Optional directory to also write the results to as Parquet files
+    :param match_content: If True, images that do not match a tif by name are matched by what they look like
+    :param prometheus_path: Optional file to also write the run's measurements to in the Prometheus text format
+    :param links_only: Optional list of url prefixes; pages under them are only searched for links, not scraped
+    :return: None
+    """
+    from Crawler import Crawler, DownloadList  # imported here since Crawler uses the functions in this module
     links_visited = []  # list of links visited
-    web(links_visited, 'https://pmss.wpengine.com/', pages_list)
+    archive = WarcArchive(warc_path)
+    skipped_downloads = DownloadList()  # collects the images instead of downloading them
+    crawler = Crawler(cache=archive, downloader=skipped_downloads, parse_workers=parse_workers,
+                      links_only=links_only_filter(links_only))
+    with PageSink(Paths.PAGES) as pages_list:
+        with get_metrics().stage("crawl"):
+            crawler.crawl(links_visited, 'https://pmss.wpengine.com/', pages_list)
+        print(f"{len(pages_list)} pages read from {len(archive)} archived pages, {len(crawler.missing)} linked pages "
+              f"were not archived, {len(skipped_downloads.downloads)} missing images were not downloaded")
+        for web_url in crawler.missing:
+            print(f"Not archived: {web_url}")
+        make_results(pages_list, parquet_dir, match_content)
+    run_time()
+    write_run_report(prometheus_path)
+
+
+def content_matches(images, index, already_matched):
+    """
+    Finds the archive tif for the scraped images that did not match one by name, by comparing perceptual hashes
+    :param images: Dictionary that stores all of the images
+    :param index: ArchiveIndex with the scraped images and the archive in it
+    :param already_matched: The image keys that were already matched to a tif
+    :return: A dictionary with the image key as the key and the tif's file name as the value
+    """
+    content_matcher = ContentMatcher()
+    if not content_matcher.available():
+        print("Pillow is not installed, so pictures were only matched to their \"tif\" by name")
+        content_matcher.close()
+        return {}
+    scraped_files = {}
+    for root, name in index.files(Paths.SCRAPED_IMAGES):
+        if name[:-4] in images and name[:-4] not in already_matched:
+            if images[name[:-4]].file_name[-3:] != "tif":
+                scraped_files.setdefault(name[:-4], os.path.join(root, name))
+    tif_files = [os.path.join(root, name) for root, name in index.files(Paths.PMSS_ARCHIVE, ".tif")]
+    matched_items = content_matcher.match_images(images, scraped_files, tif_files)
+    content_matcher.close()
+    return matched_items
+
+
+def make_results(pages_list, parquet_dir=None, match_content=False):
+    """
+    Combines the scraped pages, reports on them, and packages the images and csv files for CONTENTdm
+    :param pages_list: The scraped pages; a PageSink is read one page at a time
+    :param parquet_dir: Optional directory to also write the results to as Parquet files
+    :param match_content: If True, images that do not match a tif by name are matched by what they look like
+    :return: None
+    """
     print("~~----Scraping Results----~~")
-    bib_master_list, images_master_list, guide_pages, transcript_counter, \
-        caption_counter, duplicate_counter, alt_captions_counter, no_caption_counter = create_master_list(
-            pages_list)  # Save the master lists to variables
+    metrics = get_metrics()
+    with metrics.stage("master list"):
+        bib_master_list, images_master_list, guide_pages, transcript_counter, \
+            caption_counter, duplicate_counter, alt_captions_counter, no_caption_counter = create_master_list(
+                pages_list)  # Save the master lists to variables
 
     print_results(pages_list, images_master_list, transcript_counter, caption_counter, duplicate_counter,
                   bib_master_list, alt_captions_counter, no_caption_counter)
-    write_result_files(bib_master_list, images_master_list, guide_pages)
-
-    hdd_images = dir_dive()
-    stripped_images = file_split_website(images_master_list)
-    items_to_fix = compare_page_to_hdd(stripped_images, hdd_images)
-    for to_change in items_to_fix:
-        images_master_list[stripped_images[to_change]].file_name = hdd_images[items_to_fix[to_change]]
-    package_contents(images_master_list)
-    write_csv(images_master_list, bib_master_list)
+    with metrics.stage("result files"):
+        write_result_files(bib_master_list, images_master_list, guide_pages)
+
+    with metrics.stage("archive matching"):
+        # one index of the drive answers every lookup below; only directories that changed since the last run are
+        # listed
+        index = open_index(Paths.PMSS_ARCHIVE, Paths.SCRAPED_IMAGES)
+        matcher = NameMatcher()
+        for root, name in index.files(Paths.PMSS_ARCHIVE):
+            matcher.add(name, root)
+        items_to_fix = matcher.match_images(images_master_list)
+        if match_content:  # images renamed on upload can still be found by what they look like
+            items_to_fix.update(content_matches(images_master_list, index, items_to_fix))
+        for to_change in items_to_fix:
+            images_master_list[to_change].file_name = items_to_fix[to_change]
+    with metrics.stage("dataset export"):
+        dataset = DatasetExport()  # the results as tables that can be queried
+        dataset.write(bib_master_list, images_master_list, guide_pages)
+        if parquet_dir:
+            if not dataset.write_parquet(parquet_dir):
+                print("pyarrow is not installed, so no Parquet files were written")
+        dataset.close()
+    with metrics.stage("packaging"):
+        package_contents(images_master_list, index)
+    with metrics.stage("csv export"):
+        write_csv(images_master_list, bib_master_list, index)
+    index.close()
 
     # for image in images_master_list.keys():
     #     captions = images_master_list[image].alt_captions
     #     captions.append(images_master_list[image].caption)
 
     # phpmyadmin_images = extract_csv_information("image_list_with_captions-j45ab3_posts.csv")
-    run_time()
 
 
 start_time = time.time()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrapes the Pine Mountain Settlement School website")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted crawl")
+    parser.add_argument("--parse-workers", type=int, default=0, metavar="COUNT",
+                        help="parse pages in COUNT processes while fetching, for example the number of cores")
+    parser.add_argument("--parquet", metavar="DIRECTORY", help="also write the results as Parquet files")
+    parser.add_argument("--match-content", action="store_true",
+                        help="match images to tifs by perceptual hash when their names do not match (needs Pillow)")
+    parser.add_argument("--fixity", action="store_true",
+                        help="only hash the archive's new and changed tifs and report duplicate and corrupt ones")
+    parser.add_argument("--audit", action="store_true", help="with --fixity, hash every tif again")
+    parser.add_argument("--prometheus", metavar="FILE",
+                        help="also write the run's measurements to FILE in the Prometheus text format")
+    parser.add_argument("--replay", metavar="PAGES_FILE",
+                        help="make the results from the pages saved by an earlier crawl instead of crawling")
+    parser.add_argument("--replay-warc", metavar="WARC_FILE",
+                        help="scrape the pages archived by an earlier crawl again without connecting to the website")
+    parser.add_argument("--links-only", action="append", metavar="URL_PREFIX",
+                        help="only follow the links on pages whose url starts with URL_PREFIX instead of scraping "
+                             "them; can be given more than once")
+    arguments = parser.parse_args()
+    if arguments.fixity:
+        archive_index = open_index(Paths.PMSS_ARCHIVE)
+        with get_metrics().stage("fixity"):
+            check_archive(archive_index, arguments.audit)
+        archive_index.close()
+        run_time()
+        write_run_report(arguments.prometheus)
+    elif arguments.replay_warc:
+        if not os.path.isfile(arguments.replay_warc):
+            parser.error(f"{arguments.replay_warc} does not exist")
+        replay_archive(arguments.replay_warc, arguments.parse_workers, arguments.parquet, arguments.match_content,
+                       arguments.prometheus, arguments.links_only)
+    elif arguments.replay:
+        if not os.path.isfile(arguments.replay):
+            parser.error(f"{arguments.replay} does not exist")
+        make_results(SavedPages(arguments.replay), arguments.parquet, arguments.match_content)  # only read
+        run_time()
+        write_run_report(arguments.prometheus)
+    else:
+        main(arguments.resume, arguments.parse_workers, arguments.parquet, arguments.match_content,
+             arguments.prometheus, arguments.links_only)
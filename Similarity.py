@@ -0,0 +1,184 @@
+import random
+import string
+import time
+
+
+def ratio(s, t, cutoff=0.0):
+    """
+    Calculates the Levenshtein ratio of similarity between two strings, where a substitution costs 2.
+    With that cost the distance is len(s) + len(t) - 2 * LCS, so the ratio is 2 * LCS / (len(s) + len(t)) and only
+    the length of the longest common subsequence is needed. It is found with a bit-parallel algorithm that handles
+    a whole column of the distance matrix with a few integer operations.
+    :param s: The first string
+    :param t: The second string
+    :param cutoff: If the ratio can not reach this value the comparison stops early and 0 is returned
+    :return: The ratio as a number between 0 and 1
+    """
+    if s == "" or t == "":
+        return 0
+    return Matcher(s).ratio(t, cutoff)
+
+
+def ratio_many(query, choices, cutoff=0.0):
+    """
+    Compares one string against many, reusing the work done on the query for every comparison
+    :param query: The string to compare
+    :param choices: A list of strings to compare the query to
+    :param cutoff: Comparisons that can not reach this ratio stop early and get 0
+    :return: A list with the ratio for every choice
+    """
+    if query == "":
+        return [0 for _ in choices]
+    matcher = Matcher(query)
+    return [matcher.ratio(choice, cutoff) if choice != "" else 0 for choice in choices]
+
+
+def first_match(query, choices, cutoff):
+    """
+    Finds the first choice that is at least cutoff similar to the query
+    :param query: The string to compare
+    :param choices: A list of strings to compare the query to
+    :param cutoff: The lowest ratio that counts as a match
+    :return: The index of the first matching choice, or None if nothing matched
+    """
+    if query == "":
+        return None
+    matcher = Matcher(query)
+    for index, choice in enumerate(choices):
+        if choice != "" and matcher.ratio(choice, cutoff) >= cutoff:
+            return index
+    return None
+
+
+def distance(s, t):
+    """
+    Calculates the plain Levenshtein distance between two strings, where a substitution costs 1
+    :param s: The first string
+    :param t: The second string
+    :return: The number of edits needed to turn s into t
+    """
+    previous = list(range(len(t) + 1))
+    for row in range(1, len(s) + 1):
+        current = [row] + [0] * len(t)
+        for col in range(1, len(t) + 1):
+            cost = 0 if s[row - 1] == t[col - 1] else 1
+            current[col] = min(previous[col] + 1, current[col - 1] + 1, previous[col - 1] + cost)
+        previous = current
+    return previous[-1]
+
+
+class Matcher:
+    def __init__(self, query):
+        """
+        Prepares a string to be compared against many others
+        :param query: The string that will be compared
+        """
+        self.query = query
+        self.length = len(query)
+        self.all_ones = (1 << self.length) - 1
+        self.masks = {}  # a bit mask for every character with the positions it appears at in the query
+        self.counts = {}  # how many times every character appears in the query
+        for position, character in enumerate(query):
+            self.masks[character] = self.masks.get(character, 0) | (1 << position)
+            self.counts[character] = self.counts.get(character, 0) + 1
+
+    def ratio(self, other, cutoff=0.0):
+        """
+        :param other: The string to compare the query to
+        :param cutoff: If the ratio can not reach this value the comparison stops early and 0 is returned
+        :return: The ratio as a number between 0 and 1
+        """
+        total = self.length + len(other)
+        needed = cutoff * total / 2  # the length the common subsequence has to reach to meet the cutoff
+        if min(self.length, len(other)) < needed:  # the strings' lengths are too different
+            return 0
+        if cutoff > 0 and self.shared_characters(other) < needed:  # not enough characters in common
+            return 0
+        masks = self.masks
+        all_ones = self.all_ones
+        columns = self.all_ones  # a 0 bit marks a row where the common subsequence grew
+        remaining = len(other)
+        for character in other:
+            matches = columns & masks.get(character, 0)
+            columns = ((columns + matches) | (columns - matches)) & all_ones
+            remaining -= 1
+            # every 16 characters check if the rest of the string could still bring the ratio up to the cutoff
+            if cutoff > 0 and remaining and remaining % 16 == 0:
+                if self.length - bin(columns).count("1") + remaining < needed:
+                    return 0
+        common = self.length - bin(columns).count("1")
+        result = 2 * common / total
+        return result if result >= cutoff else 0
+
+    def shared_characters(self, other):
+        """
+        An upper bound on the common subsequence: each character can only match as often as it appears in both strings
+        :param other: The string to compare the query to
+        :return: The number of characters the strings share
+        """
+        other_counts = {}
+        for character in other:
+            other_counts[character] = other_counts.get(character, 0) + 1
+        return sum(min(count, self.counts.get(character, 0)) for character, count in other_counts.items())
+
+
+def matrix_ratio(s, t):
+    """
+    The matrix based ratio that was used before this module, kept so the benchmark can compare against it
+    :param s: The first string
+    :param t: The second string
+    :return: The ratio as a number between 0 and 1
+    """
+    import numpy as np
+    rows = len(s) + 1
+    cols = len(t) + 1
+    distance_matrix = np.zeros((rows, cols), dtype=int)
+    if s == "" or t == "":
+        return 0
+    for i in range(1, rows):
+        distance_matrix[i][0] = i
+    for k in range(1, cols):
+        distance_matrix[0][k] = k
+    for col in range(1, cols):
+        for row in range(1, rows):
+            cost = 0 if s[row - 1] == t[col - 1] else 2
+            distance_matrix[row][col] = min(distance_matrix[row - 1][col] + 1, distance_matrix[row][col - 1] + 1,
+                                            distance_matrix[row - 1][col - 1] + cost)
+    return ((len(s) + len(t)) - distance_matrix[rows - 1][cols - 1]) / (len(s) + len(t))
+
+
+def benchmark(pairs=200, seed=13):
+    """
+    Times the matrix based ratio against this module on caption length strings and checks that they agree
+    :param pairs: How many pairs of captions to compare
+    :param seed: Seed for the random captions so every run compares the same strings
+    :return: None
+    """
+    generator = random.Random(seed)
+    letters = string.ascii_lowercase + "      "
+    captions = []
+    for _ in range(pairs):
+        caption = "".join(generator.choice(letters) for _ in range(generator.randint(40, 160)))
+        edited = list(caption)
+        for _ in range(generator.randint(0, len(caption) // 3)):  # make a similar caption with some edits
+            edited[generator.randrange(len(edited))] = generator.choice(letters)
+        captions.append((caption, "".join(edited)))
+
+    started = time.perf_counter()
+    expected = [matrix_ratio(s, t) for s, t in captions]
+    matrix_time = time.perf_counter() - started
+    started = time.perf_counter()
+    found = [ratio(s, t) for s, t in captions]
+    bit_time = time.perf_counter() - started
+    started = time.perf_counter()
+    [ratio(s, t, .80) for s, t in captions]
+    cutoff_time = time.perf_counter() - started
+
+    assert all(abs(a - b) < 1e-12 for a, b in zip(expected, found)), "the ratios do not match"
+    print(f"matrix ratio:        {matrix_time:.4f}s")
+    print(f"bit-parallel ratio:  {bit_time:.4f}s ({matrix_time / bit_time:.0f}x faster)")
+    print(f"with .80 cutoff:     {cutoff_time:.4f}s ({matrix_time / cutoff_time:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    benchmark()
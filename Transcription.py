@@ -1,4 +1,6 @@
 class Transcription:
+    __slots__ = ("transcript_link", "transcription")
+
     def __init__(self):
         self.transcript_link = ""
         self.transcription = ""
@@ -0,0 +1,144 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from Metrics import get_metrics
+
+# the User-Agent header mimics a browser
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36\
+      (KHTML, like Gecko) Chrome/74.0.3729.169 Safari/537.36'}
+RETRY_STATUSES = {429, 500, 502, 503, 504}  # responses that are worth asking for again
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0  # how many requests were sent, including retries
+        self.retries = 0  # how many of those requests were retries
+        self.errors = 0  # how many requests failed for good
+        self.bytes = 0  # how many bytes of bodies were received
+        self.total_latency = 0.0  # seconds spent waiting for responses
+        self.max_latency = 0.0  # the slowest single response
+
+    def __str__(self):
+        average = self.total_latency / self.requests if self.requests else 0
+        return f"{self.requests} requests, {self.retries} retries, {self.errors} errors, {self.bytes} bytes, " \
+               f"{average:.3f}s average latency, {self.max_latency:.3f}s max latency"
+
+
+class Transport:
+    def __init__(self, connect_timeout=10, read_timeout=60, max_retries=5, backoff=0.5, pool_size=32):
+        """
+        One pooled HTTP session shared by everything that talks to the website
+        :param connect_timeout: Seconds to wait for a connection to open
+        :param read_timeout: Seconds to wait between bytes of a response
+        :param max_retries: How many times a failed request is tried again
+        :param backoff: Seconds to wait before the first retry; the wait doubles for each retry after that
+        :param pool_size: How many keep-alive connections are kept open to each host
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {}  # a dictionary of EndpointStats with the endpoint as the key
+        self.archive = None  # optional WarcWriter that keeps a copy of every page that is fetched
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, stream=False, endpoint=None):
+        """
+        Sends a GET request, retrying with exponential backoff on server errors, rate limits and dropped connections
+        :param url: The url to request
+        :param headers: Extra headers to send with the request
+        :param stream: If True, the body is not downloaded until the caller reads it
+        :param endpoint: The name the request is counted under, the url's host by default
+        :return: A requests Response
+        """
+        endpoint = endpoint or urlsplit(url).netloc
+        attempt = 0
+        request_started = time.monotonic()  # the url's latency includes every retry
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.record(endpoint, time.monotonic() - started, 0, attempt > 0)
+                if attempt >= self.max_retries:
+                    self.record_error(endpoint)
+                    raise
+            else:
+                size = 0 if stream else len(response.content)  # streamed bodies are counted by the reader
+                self.record(endpoint, time.monotonic() - started, size, attempt > 0)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    if response.status_code in RETRY_STATUSES:
+                        self.record_error(endpoint)
+                    if not stream:
+                        get_metrics().record_fetch(url, time.monotonic() - request_started, size)
+                        if self.archive is not None and response.status_code != 304:  # a 304 has no page in it
+                            self.archive.write_response(url, response.status_code, response.reason,
+                                                        response.headers, response.content)
+                    return response
+                wait = retry_after(response)
+                response.close()
+                if wait is not None:
+                    time.sleep(wait)
+                    attempt += 1
+                    continue
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def record(self, endpoint, latency, size, retry):
+        with self.lock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.retries += 1 if retry else 0
+            stats.bytes += size
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+
+    def record_bytes(self, endpoint, size):
+        """
+        Counts bytes read from a streamed response
+        :param endpoint: The name the request was counted under
+        :param size: How many bytes were read
+        :return: None
+        """
+        with self.lock:
+            self.stats.setdefault(endpoint, EndpointStats()).bytes += size
+
+    def record_error(self, endpoint):
+        with self.lock:
+            self.stats.setdefault(endpoint, EndpointStats()).errors += 1
+
+    def print_stats(self):
+        for endpoint in sorted(self.stats):
+            print(f"{endpoint}: {self.stats[endpoint]}")
+
+
+def retry_after(response):
+    """
+    Reads how long the server asked us to wait before trying again
+    :param response: A requests Response
+    :return: The number of seconds to wait, or None if the server did not say
+    """
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+transport = None  # the Transport shared by the whole program
+
+
+def get_transport():
+    """
+    Finds the shared Transport, making it the first time it is needed
+    :return: The shared Transport
+    """
+    global transport
+    if transport is None:
+        transport = Transport()
+    return transport
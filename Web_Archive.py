@@ -0,0 +1,211 @@
+import base64
+import gzip
+import hashlib
+import os
+import threading
+import time
+import uuid
+import zlib
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from Http_Cache import canonical_url
+
+READ_SIZE = 64 * 1024  # how many compressed bytes are read at a time
+# requests has already undone these by the time the body is saved, so they no longer describe it
+DROPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+def block_digest(block):
+    return "sha1:" + base64.b32encode(hashlib.sha1(block).digest()).decode("ascii")
+
+
+def warc_record(warc_type, headers, block):
+    """
+    Builds one WARC/1.0 record
+    :param warc_type: The WARC-Type, like "response" or "warcinfo"
+    :param headers: A list of (name, value) pairs for the record's other WARC headers
+    :param block: The record's content as bytes
+    :return: The record as bytes
+    """
+    lines = ["WARC/1.0", "WARC-Type: " + warc_type, "WARC-Record-ID: <urn:uuid:%s>" % uuid.uuid4(),
+             "WARC-Date: " + time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())]
+    lines += ["%s: %s" % (name, value) for name, value in headers]
+    lines += ["Content-Length: %d" % len(block), "", ""]
+    return "\r\n".join(lines).encode("utf-8") + block + b"\r\n\r\n"
+
+
+class WarcWriter:
+    def __init__(self, file_path, resume=False):
+        """
+        Keeps a copy of every page the crawler fetches in a gzipped WARC file, the format web archives use, so the
+        pages can be scraped again later without the website. Every record is its own gzip member so a crash only
+        loses the record being written and a single record can be read without reading the ones before it.
+        :param file_path: The .warc.gz file the pages are written to
+        :param resume: If True, add to the pages already in the file instead of starting a new file
+        """
+        self.file_path = file_path
+        self.lock = threading.Lock()  # pages are fetched on many threads
+        self.records = 0  # how many responses were written
+        starting = not (resume and os.path.exists(file_path))
+        self.file = open(file_path, "wb" if starting else "r+b")
+        if not starting:
+            # a record cut off by a crash is dropped so the records added after it can still be read
+            self.file.truncate(complete_length(file_path))
+            self.file.seek(0, os.SEEK_END)
+        if starting:
+            fields = "software: PMSS_Scraper\r\nformat: WARC File Format 1.0\r\n".encode("utf-8")
+            self.write(warc_record("warcinfo", [("WARC-Filename", os.path.basename(file_path)),
+                                                ("Content-Type", "application/warc-fields")], fields))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record, counted=False):
+        compressed = gzip.compress(record)  # compressed before taking the lock so threads do not wait on each other
+        with self.lock:
+            self.file.write(compressed)
+            self.file.flush()
+            self.records += 1 if counted else 0
+
+    def write_response(self, url, status, reason, headers, body):
+        """
+        Saves a response as a WARC response record
+        :param url: The url that was requested
+        :param status: The HTTP status code
+        :param reason: The HTTP reason phrase, like "OK"
+        :param headers: The response headers
+        :param body: The body as bytes, after any content encoding has been undone
+        :return: None
+        """
+        lines = ["HTTP/1.1 %d %s" % (status, reason or "")]
+        lines += ["%s: %s" % (name, value) for name, value in headers.items() if name.lower() not in DROPPED_HEADERS]
+        lines += ["Content-Length: %d" % len(body), "", ""]
+        block = "\r\n".join(lines).encode("iso-8859-1", errors="replace") + body
+        self.write(warc_record("response", [("WARC-Target-URI", url),
+                                            ("Content-Type", "application/http;msgtype=response"),
+                                            ("WARC-Payload-Digest", block_digest(body)),
+                                            ("WARC-Block-Digest", block_digest(block))], block), counted=True)
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def members(file_path, start=0):
+    """
+    Reads a gzip file one member at a time
+    :param file_path: A gzip file made of one or more members
+    :param start: The offset of the first member to read
+    :return: The offset, the end and the decompressed contents of each member; a member that was cut off is left out
+    """
+    with open(file_path, "rb") as archive_file:
+        archive_file.seek(start)
+        position = start  # the offset of the first byte in buffer
+        buffer = b""
+        while True:
+            if not buffer:
+                buffer = archive_file.read(READ_SIZE)
+                if not buffer:
+                    return
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)  # 16 reads the gzip header and trailer
+            member_start = position
+            parts = []
+            while True:
+                try:
+                    parts.append(decompressor.decompress(buffer))
+                except zlib.error:  # the rest of the file is damaged
+                    return
+                if decompressor.eof:
+                    position += len(buffer) - len(decompressor.unused_data)
+                    buffer = decompressor.unused_data
+                    break
+                position += len(buffer)
+                buffer = archive_file.read(READ_SIZE)
+                if not buffer:
+                    return
+            yield member_start, position, b"".join(parts)
+
+
+def complete_length(file_path):
+    """
+    :param file_path: A gzip file made of one or more members
+    :return: The number of bytes at the start of the file that hold whole members
+    """
+    length = 0
+    for _, length, _ in members(file_path):
+        pass
+    return length
+
+
+def parse_record(data):
+    """
+    :param data: One WARC record as bytes
+    :return: A dictionary of the record's WARC headers and the record's content as bytes
+    """
+    head, _, rest = data.partition(b"\r\n\r\n")
+    headers = CaseInsensitiveDict()
+    for line in head.decode("utf-8", errors="replace").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+    return headers, rest[:int(headers.get("Content-Length", len(rest)))]
+
+
+def parse_response(block):
+    """
+    :param block: The content of a WARC response record
+    :return: The HTTP status code, the response headers and the body
+    """
+    head, _, body = block.partition(b"\r\n\r\n")
+    lines = head.decode("iso-8859-1").split("\r\n")
+    headers = CaseInsensitiveDict()
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+    return int(lines[0].split()[1]), headers, body
+
+
+class WarcArchive:
+    def __init__(self, file_path):
+        """
+        Serves the pages saved by a WarcWriter in place of the website. It has the same get() as an HttpCache so a
+        Crawler can crawl the archive exactly like it crawls the site, without sending a single request.
+        :param file_path: A .warc.gz file written by WarcWriter
+        """
+        self.file_path = file_path
+        self.offsets = {}  # a dictionary with the url as the key and the offset of its newest record as the value
+        for offset, _, data in members(file_path):
+            headers, _ = parse_record(data)
+            if headers.get("WARC-Type") == "response":
+                self.offsets[canonical_url(headers["WARC-Target-URI"])] = offset
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, url):
+        return canonical_url(url) in self.offsets
+
+    def response(self, url):
+        """
+        :param url: The url of a page
+        :return: The HTTP status code, the response headers and the body saved for the url
+        """
+        for _, _, data in members(self.file_path, self.offsets[canonical_url(url)]):
+            return parse_response(parse_record(data)[1])
+        raise KeyError(url)
+
+    def get(self, url, headers=None):
+        """
+        Gets the html for a page from the archive
+        :param url: The url of the page
+        :param headers: Ignored; accepted so the archive can take the place of an HttpCache
+        :return: The html as text, decoded the same way requests decoded it during the crawl, or None if the url is
+        not in the archive
+        """
+        if url not in self:
+            return None
+        _, response_headers, body = self.response(url)
+        return body.decode(get_encoding_from_headers(response_headers) or "utf-8", errors="replace")
@@ -0,0 +1,61 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import Paths
+from Crawler import Crawler, DownloadList
+from Scraper import links_only_filter
+from Web_Archive import WarcArchive, WarcWriter
+
+START = "https://pmss.wpengine.com/"
+ARCHIVED = "https://pmss.wpengine.com/?page_id=1"
+NOT_ARCHIVED = "https://pmss.wpengine.com/?page_id=2"
+
+
+def html(title, links):
+    return ('<html><body><article class="page"><h1 class="entry-title">%s</h1>'
+            '<div class="entry-content">\n<p>%s</p>\n</div></article>%s</body></html>'
+            % (title, title, "".join('<a href="%s">%s</a>' % (link, link) for link in links)))
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.scraped_images = Paths.SCRAPED_IMAGES
+        Paths.SCRAPED_IMAGES = self.directory.name
+        self.warc_path = os.path.join(self.directory.name, "pages.warc.gz")
+        with WarcWriter(self.warc_path) as writer:
+            for url, body in ((START, html("Home", [ARCHIVED, NOT_ARCHIVED])), (ARCHIVED, html("Farm", [START]))):
+                writer.write_response(url, 200, "OK", {"Content-Type": "text/html; charset=UTF-8"},
+                                      body.encode("utf-8"))
+
+    def tearDown(self):
+        Paths.SCRAPED_IMAGES = self.scraped_images
+        self.directory.cleanup()
+
+    def test_missing_page_is_recorded_and_skipped(self):
+        archive = WarcArchive(self.warc_path)
+        self.assertIsNone(archive.get(NOT_ARCHIVED))
+        crawler = Crawler(cache=archive, downloader=DownloadList())
+        links_visited = []
+        pages = []
+        with contextlib.redirect_stdout(io.StringIO()):  # pages_info prints every page
+            crawler.crawl(links_visited, START, pages)
+        self.assertEqual(sorted(page.url for page in pages), sorted([START, ARCHIVED]))
+        self.assertEqual(crawler.missing, [NOT_ARCHIVED])
+        self.assertIn(NOT_ARCHIVED, links_visited)
+
+    def test_links_only_page_is_followed_but_not_scraped(self):
+        crawler = Crawler(cache=WarcArchive(self.warc_path), downloader=DownloadList(),
+                          links_only=links_only_filter([START + "?page_id="]))
+        links_visited = []
+        pages = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            crawler.crawl(links_visited, START, pages)
+        self.assertEqual([page.url for page in pages], [START])
+        self.assertEqual(links_visited, [START, ARCHIVED, NOT_ARCHIVED])
+
+
+if __name__ == "__main__":
+    unittest.main()